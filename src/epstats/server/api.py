@@ -14,6 +14,7 @@ from .api_evaluate import get_evaluate_router
 from .api_sample_size_calculation import get_sample_size_calculation_router
 from .api_settings import ApiSettings
 from .json_response import DataScienceJsonResponse
+from .req import Experiment
 
 
 def get_api(settings: ApiSettings, get_dao, get_executor_pool) -> FastAPI:
@@ -46,6 +47,15 @@ def get_api(settings: ApiSettings, get_dao, get_executor_pool) -> FastAPI:
     async def readiness_liveness_probe():
         return {"message": "ep-stats-api is ready"}
 
+    if settings.validation_endpoint:
+
+        @api.post("/validate", tags=["Experiment Evaluation"])
+        async def validate_experiment(experiment: Experiment):
+            """
+            Validates single `Experiment` without evaluating it.
+            """
+            return {"message": f"experiment [{experiment.id}] is valid"}
+
     api.include_router(get_evaluate_router(get_dao, get_executor_pool))
     api.include_router(get_sample_size_calculation_router(get_executor_pool))
 
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 
@@ -45,4 +46,16 @@ def get_sample_size_calculation_router(get_executor_pool) -> APIRouter:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(evaluation_pool, _sample_size_calculation, data)
 
+    @router.post("/sample-size-calculation/batch", response_model=List[SampleSizeCalculationResult])
+    async def sample_size_calculation_batch(
+        data: List[SampleSizeCalculationData],
+        evaluation_pool: ThreadPoolExecutor = Depends(get_executor_pool),
+    ):
+        """
+        Calculates sample sizes for every item in `data` in a single request, results are in the same order.
+        """
+        _logger.info(f"Calling the batch sample size calculation with {len(data)} items")
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(evaluation_pool, lambda: [_sample_size_calculation(d) for d in data])
+
     return router
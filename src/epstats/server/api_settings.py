@@ -13,3 +13,6 @@ class ApiSettings(BaseSettings):
     log_level: str = "info"
     evaluation_pool_size: int = 10
     web_workers: int = 1
+
+    # exposes `/validate` endpoint that only validates the evaluation request, meant for testing
+    validation_endpoint: bool = False
@@ -1,16 +1,30 @@
-from datetime import datetime
+from datetime import date, datetime
 from inspect import signature
 from typing import Any, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from pyparsing import ParseException
 
-from ..toolkit import DEFAULT_CONFIDENCE_LEVEL, DEFAULT_POWER, FilterScope, Parser
+from ..toolkit import DEFAULT_CONFIDENCE_LEVEL, DEFAULT_POWER, FilterScope
 from ..toolkit import Experiment as EvExperiment
 from ..toolkit import Filter as EvFilter
 from ..toolkit import Metric as EvMetric
 from ..toolkit import SrmCheck as EvSrmCheck
 from ..toolkit import SumRatioCheck as EvSumRatioCheck
+from ..toolkit.parser import get_parser
+
+
+def _parse_date(value: str) -> date:
+    """
+    Parses `2020-06-15` formatted date. Canonical dates take the `date.fromisoformat` fast path,
+    anything else goes through `strptime` which raises `ValueError` on invalid input.
+    """
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, "%Y-%m-%d").date()
 
 
 class Metric(BaseModel):
@@ -58,8 +72,7 @@ class Metric(BaseModel):
         if not denominator:
             raise ValueError("we expect denominator to be non-empty")
         try:
-            parser = Parser(nominator, denominator)
-            if not parser.get_goals():
+            if not get_parser(nominator, denominator).get_goals_str():
                 raise ValueError("We expect the metric to have at least one goal in nominator and denominator")
             return self
         except ParseException as e:
@@ -123,8 +136,7 @@ class Check(BaseModel):
             raise ValueError(f"we expect {which} to be non-empty")
 
         try:
-            parser = Parser(value, value)
-            if not parser.get_goals():
+            if not get_parser(value, value).get_goals_str():
                 raise ValueError(f"We expect the check to have at least one goal in {which}")
             return value
         except ParseException as e:
@@ -286,7 +298,7 @@ class Experiment(BaseModel):
     def date_from_must_be_date(cls, value):
         if value is not None:
             try:
-                datetime.strptime(value, "%Y-%m-%d")
+                _parse_date(value)
             except ValueError:
                 raise ValueError("we expect date_from to be in `2020-06-15` format")
 
@@ -297,7 +309,7 @@ class Experiment(BaseModel):
     def date_to_must_be_date(cls, value):
         if value is not None:
             try:
-                datetime.strptime(value, "%Y-%m-%d")
+                _parse_date(value)
             except ValueError:
                 raise ValueError("we expect date_to to be in `2020-06-15` format")
 
@@ -309,13 +321,13 @@ class Experiment(BaseModel):
             raise ValueError("date_for requires date_from and date_to to be present as well")
         if self.date_from is not None and self.date_to is not None:
             try:
-                df = datetime.strptime(self.date_from, "%Y-%m-%d")  # noqa: PD901
-                dt = datetime.strptime(self.date_to, "%Y-%m-%d")
+                df = _parse_date(self.date_from)  # noqa: PD901
+                dt = _parse_date(self.date_to)
             except ValueError:
                 raise ValueError("cannot parse date_from, date_to")
             if self.date_for is not None:
                 try:
-                    dfor = datetime.strptime(self.date_for, "%Y-%m-%d")
+                    dfor = _parse_date(self.date_for)
                 except ValueError:
                     raise ValueError("cannot parse date_for")
                 if dfor < df:
@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 from scipy.stats import chisquare
 
-from .parser import Parser
+from .parser import get_parser
 
 
 class Check:
@@ -19,7 +19,7 @@ class Check:
         self.id = id
         self.name = name
         self.denominator = denominator
-        self._denominator_parser = Parser(denominator, denominator)
+        self._denominator_parser = get_parser(denominator, denominator)
         self._goals = self._denominator_parser.get_goals()
 
     def get_goals(self) -> List:
@@ -244,7 +244,7 @@ class SumRatioCheck(Check):
         self.max_sum_ratio = max_sum_ratio
         self.confidence_level = confidence_level
         self.nominator = nominator
-        self._nominator_parser = Parser(nominator, nominator)
+        self._nominator_parser = get_parser(nominator, nominator)
         self._goals = self._goals.union(self._nominator_parser.get_goals())
 
     def evaluate_agg(self, goals: pd.DataFrame, default_exp_variant_id: str) -> pd.DataFrame:
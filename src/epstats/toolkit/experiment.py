@@ -189,6 +189,13 @@ class Experiment:
                 ]
             )
         ]
+        self._goals = list(
+            set().union(
+                *(m.get_goals() for m in self.metrics),
+                *(c.get_goals() for c in self.checks),
+                self._exposure_goals,
+            )
+        )
         self._update_dimension_to_value()
         self.filters = filters if filters is not None else []
         self.query_parameters = query_parameters
@@ -218,9 +225,10 @@ class Experiment:
                     all_goals.append(attr._denominator_expr.get_goals())
 
         all_goals = chain(*all_goals, self._exposure_goals)
+        dimensions = self.get_dimension_columns()
 
         for goal in all_goals:
-            for dimension in self.get_dimension_columns():
+            for dimension in dimensions:
                 if dimension not in goal.dimension_to_value:
                     goal.dimension_to_value[dimension] = ""
 
@@ -489,13 +497,7 @@ class Experiment:
         Returns:
             list of parsed structured goals
         """
-        res = set()
-        for m in self.metrics:
-            res = res.union(m.get_goals())
-        for c in self.checks:
-            res = res.union(c.get_goals())
-        res = res.union(self._exposure_goals)
-        return list(res)
+        return self._goals
 
     @staticmethod
     def _metrics_column_fce_agg(m: Metric, goals: pd.DataFrame):
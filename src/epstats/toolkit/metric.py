@@ -3,7 +3,7 @@ from typing import Optional, Set
 import numpy as np
 import pandas as pd
 
-from .parser import Parser
+from .parser import get_parser
 
 
 class Metric:
@@ -53,7 +53,7 @@ class Metric:
         self.name = name
         self.nominator = nominator
         self.denominator = denominator
-        self._parser = Parser(nominator, denominator)
+        self._parser = get_parser(nominator, denominator)
         self._goals = self._parser.get_goals()
         self.metric_format = metric_format
         self.metric_value_multiplier = metric_value_multiplier
@@ -1,11 +1,16 @@
+import re
+import sys
 from collections import Counter
-from functools import reduce
+from copy import copy
+from functools import lru_cache, reduce
 from typing import Set
 
+import numpy as np
 import pandas as pd
 from pyparsing import (
     Optional,
     ParseException,
+    ParserElement,
     Word,
     alphanums,
     alphas,
@@ -16,6 +21,58 @@ from pyparsing import (
     opAssoc,
 )
 
+# tokens of nominator and denominator expressions shared by the pyparsing grammar and `_FastParser`
+_FUNCS = ["value", "count", "unique"]
+_AGG_TYPES = ["unit", "global"]
+_UNIT_TYPE_CHARS = alphas + "_"
+_GOAL_CHARS = alphas + "_" + nums
+_DIMENSION_CHARS = alphanums + "_"
+_DIMENSION_VALUE_CHARS = alphanums + "_" + "-" + "." + "%" + " " + "/" + "|"
+_DIMENSION_OPERATORS = ["<", "=", ">", "<=", ">=", "=^", "!="]
+
+
+@lru_cache(maxsize=None)
+def _get_grammar():
+    """
+    Builds pyparsing grammar of nominator and denominator expressions. It is built only once
+    and shared by all `Parser` instances.
+    """
+    func = Word(alphas)
+    unit_type = Word(_UNIT_TYPE_CHARS).setParseAction(UnitType)
+    agg_type = Word(alphas).setParseAction(AggType)
+    goal = Word(_GOAL_CHARS).setParseAction(Goal)
+    number = (Optional("-") + Word(nums)).setParseAction(Number)
+    dimension = Word(_DIMENSION_CHARS).setParseAction(Dimension)
+    dimension_operator = oneOf(_DIMENSION_OPERATORS)
+    dimension_value = (dimension_operator + Word(_DIMENSION_VALUE_CHARS)).setParseAction(DimensionValue)
+    dimension_list = delimitedList(dimension + dimension_value, allow_trailing_delim=True)
+
+    ep_goal = (func + "(" + unit_type + "." + agg_type + "." + goal + ")").setParseAction(EpGoal)
+    ep_goal_with_dimensions = (
+        func + "(" + unit_type + "." + agg_type + "." + goal + "(" + dimension_list + ")" + ")"
+    ).setParseAction(EpGoal)
+    operand = number | ep_goal | ep_goal_with_dimensions
+
+    expr = infixNotation(
+        operand,
+        [(oneOf(symbol), 2, opAssoc.LEFT, op_class) for symbol, op_class in _OPERATORS],
+    )
+    return expr
+
+
+@lru_cache(maxsize=512)
+def _parse(nominator: str, denominator: str) -> "Parser":
+    return Parser(nominator, denominator)
+
+
+def get_parser(nominator: str, denominator: str) -> "Parser":
+    """
+    Gets `Parser` of `nominator` and `denominator` parsing every pair only once per process.
+    Cached parser is never handed out, every caller gets its own copy of the parsed goals
+    because `Experiment` adds missing dimensions to them.
+    """
+    return _parse(nominator, denominator)._copy()
+
 
 class Parser:
     """
@@ -24,44 +81,22 @@ class Parser:
     """
 
     def __init__(self, nominator: str, denominator: str):
-        func = Word(alphas)
-        unit_type = Word(alphas + "_").setParseAction(UnitType)
-        agg_type = Word(alphas).setParseAction(AggType)
-        goal = Word(alphas + "_" + nums).setParseAction(Goal)
-        number = (Optional("-") + Word(nums)).setParseAction(Number)
-        dimension = Word(alphanums + "_").setParseAction(Dimension)
-        dimension_value_chars = alphanums + "_" + "-" + "." + "%" + " " + "/" + "|"
-        dimension_operator = oneOf("< = > <= >= =^ !=")
-        dimension_value = (dimension_operator + Word(dimension_value_chars)).setParseAction(DimensionValue)
-        dimension_list = delimitedList(dimension + dimension_value, allow_trailing_delim=True)
-
-        ep_goal = (func + "(" + unit_type + "." + agg_type + "." + goal + ")").setParseAction(EpGoal)
-        ep_goal_with_dimensions = (
-            func + "(" + unit_type + "." + agg_type + "." + goal + "(" + dimension_list + ")" + ")"
-        ).setParseAction(EpGoal)
-        operand = number | ep_goal | ep_goal_with_dimensions
-
-        multop = oneOf("*")
-        divop = oneOf("/")
-        plusop = oneOf("+")
-        subop = oneOf("-")
-        tildaop = oneOf("~")
-
-        expr = infixNotation(
-            operand,
-            [
-                (multop, 2, opAssoc.LEFT, MultOp),
-                (divop, 2, opAssoc.LEFT, DivOp),
-                (subop, 2, opAssoc.LEFT, SubOp),
-                (plusop, 2, opAssoc.LEFT, PlusOp),
-                (tildaop, 2, opAssoc.LEFT, TildaOp),
-            ],
-        )
-
-        self._nominator_expr = expr.parseString(nominator)[0]
-        self._denominator_expr = expr.parseString(denominator)[0]
+        self._nominator_expr = _parse_expression(nominator)
+        self._denominator_expr = _parse_expression(denominator)
+        self._goals = self._nominator_expr.get_goals().union(self._denominator_expr.get_goals())
+        self._goals_str = self._nominator_expr.get_goals_str().union(self._denominator_expr.get_goals_str())
         self._update_dimension_to_value()
 
+    def _copy(self):
+        """
+        Copies parsed expressions with fresh `EpGoal` instances, terms that are never mutated are shared.
+        """
+        parser = copy(self)
+        parser._nominator_expr = self._nominator_expr._copy()
+        parser._denominator_expr = self._denominator_expr._copy()
+        parser._goals = parser._nominator_expr.get_goals().union(parser._denominator_expr.get_goals())
+        return parser
+
     def _update_dimension_to_value(self):
         """
         To every `EpGoal`, we need to add missing dimensions that are present
@@ -89,9 +124,11 @@ class Parser:
             numpy array of shape (variants, metrics) where metrics are in order of
             (count, sum_value, sum_sqr_value)
         """
-        sum_value = self._nominator_expr.evaluate_agg(goals)
-        sum_sqr_value = self._nominator_expr.evaluate_sqr(goals)
-        count = self._denominator_expr.evaluate_agg(goals)
+        # split goals only once instead of masking the whole dataframe for every goal in expressions
+        goals_by_key = dict(list(goals.groupby(["unit_type", "agg_type", "goal"], sort=False)))
+        sum_value = self._nominator_expr.evaluate_agg(goals_by_key)
+        sum_sqr_value = self._nominator_expr.evaluate_sqr(goals_by_key)
+        count = self._denominator_expr.evaluate_agg(goals_by_key)
         return count, sum_value, sum_sqr_value
 
     def evaluate_by_unit(self, goals: pd.DataFrame):
@@ -132,13 +169,13 @@ class Parser:
         """
         Get set of goals that appear in `nominator` and `denominator` expressions as `EpGoal` instances.
         """
-        return self._nominator_expr.get_goals().union(self._denominator_expr.get_goals())
+        return self._goals
 
     def get_goals_str(self) -> Set[str]:
         """
         Gets set of goals that appear in `nominator` and `denominator` expressions as strings.
         """
-        return self._nominator_expr.get_goals_str().union(self._denominator_expr.get_goals_str())
+        return self._goals_str
 
 
 class UnitType:
@@ -153,8 +190,9 @@ class UnitType:
 
 class AggType:
     def __init__(self, t):
-        if t[0] not in ["unit", "global"]:
-            raise ParseException(f"Only `unit` and `global` aggregation types are supported but `{t[0]}` received.")
+        if t[0] not in _AGG_TYPES:
+            supported = " and ".join(f"`{a}`" for a in _AGG_TYPES)
+            raise ParseException(f"Only {supported} aggregation types are supported but `{t[0]}` received.")
         self.agg_type = t[0]
 
     def __str__(self):
@@ -224,6 +262,9 @@ class Number:
     def get_goals(self) -> Set:
         return set()
 
+    def _copy(self):
+        return self
+
     __repr__ = __str__
 
 
@@ -235,8 +276,9 @@ class EpGoal:
     """
 
     def __init__(self, t):
-        if t[0] not in ["value", "count", "unique"]:
-            raise ParseException(f"Only `value`, `count`, `unique` functions are supported but `{t[0]}` received.")
+        if t[0] not in _FUNCS:
+            supported = ", ".join(f"`{f}`" for f in _FUNCS)
+            raise ParseException(f"Only {supported} functions are supported but `{t[0]}` received.")
         if t[0] == "value":
             self.column = "sum_value" if t[0] == "value" else "count"
             self.column_sqr = "sum_sqr_value" if t[0] == "value" else "sum_sqr_count"
@@ -250,6 +292,8 @@ class EpGoal:
         self.unit_type = t[2].unit_type
         self.agg_type = t[4].agg_type
         self.goal = t[6].goal
+        # interned so that non-dimensional goals share one string instance in sets of goals
+        self._key = sys.intern(f"{self.unit_type}.{self.agg_type}.{self.goal}")
 
         dimensions = [d.dimension for d in t if isinstance(d, Dimension)]
         dimension_values = [v.dimension_value for v in t if isinstance(v, DimensionValue)]
@@ -269,11 +313,9 @@ class EpGoal:
             dimension_list = ", ".join(
                 f"{d}{v}" if v[0] in "><=!" else f"{d}={v}" for d, v in self.dimension_to_value.items() if v != ""
             )
-            dimensions = f"[{dimension_list}]"
-        else:
-            dimensions = ""
+            return f"{self._key}[{dimension_list}]"
 
-        return f"{self.unit_type}.{self.agg_type}.{self.goal}{dimensions}"
+        return self._key
 
     def __str__(self):
         return self._to_string()
@@ -290,9 +332,9 @@ class EpGoal:
         return self._evaluate_agg(goals, self.column)
 
     def _get_dimension_mask(self, goals):
-        mask = pd.Series([True] * len(goals))
+        mask = np.ones(len(goals), dtype=bool)
         for dimension, dimension_value in self.dimension_to_value.items():
-            mask &= goals[dimension] == dimension_value
+            mask &= (goals[dimension] == dimension_value).to_numpy()
 
         return mask
 
@@ -307,19 +349,11 @@ class EpGoal:
     def evaluate_sqr(self, goals):
         return self._evaluate_agg(goals, self.column_sqr)
 
-    def _evaluate_agg(self, goals, column):
-        groupby_columns = ["exp_id", "exp_variant_id", "unit_type", "agg_type", "goal"]
-        return (
-            goals[
-                (goals["unit_type"] == self.unit_type)
-                & (goals["agg_type"] == self.agg_type)
-                & (goals["goal"] == self.goal)
-                & self._get_dimension_mask(goals)
-            ]
-            .groupby(groupby_columns)
-            .agg({column: "sum"})[column]
-            .to_numpy()
-        )
+    def _evaluate_agg(self, goals_by_key, column):
+        goals = goals_by_key.get((self.unit_type, self.agg_type, self.goal))
+        if goals is None:
+            return np.array([])
+        return goals[self._get_dimension_mask(goals)].groupby(["exp_id", "exp_variant_id"])[column].sum().to_numpy()
 
     def get_goals_str(self) -> Set[str]:
         return {self._to_string()}
@@ -330,6 +364,11 @@ class EpGoal:
     def is_dimensional(self):
         return bool([v for v in self.dimension_to_value.values() if v != ""])
 
+    def _copy(self):
+        goal = copy(self)
+        goal.dimension_to_value = dict(self.dimension_to_value)
+        return goal
+
     __repr__ = __str__
 
 
@@ -364,6 +403,11 @@ class Op:
     def get_goals(self) -> Set[str]:
         return set().union(*map(lambda o: o.get_goals(), self.args))
 
+    def _copy(self):
+        op = copy(self)
+        op.args = [arg._copy() for arg in self.args]
+        return op
+
     def __str__(self):
         sep = f" {self.symbol()} "
         return "(" + sep.join(map(str, self.args)) + ")"
@@ -424,3 +468,132 @@ class TildaOp(Op):
 
     def evaluate_by_unit(self, goals):
         return reduce(lambda x, y: x - y, [arg.evaluate_by_unit(goals) for arg in self.args])
+
+
+# infix operators from the highest to the lowest precedence
+_OPERATORS = [("*", MultOp), ("/", DivOp), ("-", SubOp), ("+", PlusOp), ("~", TildaOp)]
+
+
+def _chars(chars: str) -> str:
+    return f"[{re.escape(chars)}]"
+
+
+def _alternatives(tokens) -> str:
+    # longest tokens first so that e.g. `<=` is not matched as `<` like `oneOf` does
+    return "|".join(map(re.escape, sorted(tokens, key=len, reverse=True)))
+
+
+# regular expressions of `_FastParser` built from the same tokens as the pyparsing grammar in `_get_grammar`
+_WS = f"{_chars(ParserElement.DEFAULT_WHITE_CHARS)}*"
+_GOAL_RE = re.compile(
+    rf"{_WS}({_alternatives(_FUNCS)}){_WS}\({_WS}({_chars(_UNIT_TYPE_CHARS)}+){_WS}\.{_WS}({_alternatives(_AGG_TYPES)})"
+    rf"{_WS}\.{_WS}({_chars(_GOAL_CHARS)}+){_WS}([()])"
+)
+_DIMENSION_RE = re.compile(
+    rf"{_WS}({_chars(_DIMENSION_CHARS)}+){_WS}({_alternatives(_DIMENSION_OPERATORS)}){_WS}"
+    rf"({_chars(_DIMENSION_VALUE_CHARS.replace(' ', ''))}{_chars(_DIMENSION_VALUE_CHARS)}*){_WS}([,)])"
+)
+_NUMBER_RE = re.compile(rf"{_WS}(-?){_WS}({_chars(nums)}+)")
+_TOKEN_RE = re.compile(rf"{_WS}({_chars(''.join(symbol for symbol, _ in _OPERATORS) + '()')})")
+_END_RE = re.compile(rf"{_WS}$")
+
+
+class _FastParser:
+    """
+    Hand written recursive descent parser of nominator and denominator expressions building
+    the same objects as the pyparsing grammar from `_get_grammar` in a fraction of time.
+
+    It accepts only expressions it can fully consume, anything else (including errors)
+    is left to the pyparsing grammar.
+    """
+
+    # operators from the lowest to the highest precedence
+    _LEVELS = _OPERATORS[::-1]
+
+    def __init__(self, text: str):
+        # `parseString` expands tabs before matching, so do the same to read identical dimension values
+        self.text = text.expandtabs()
+        self.pos = 0
+
+    def parse(self):
+        try:
+            expr = self._parse_level(0)
+        except ParseException:
+            return None
+        if expr is None or not _END_RE.match(self.text, self.pos):
+            return None
+        return expr
+
+    def _peek(self):
+        m = _TOKEN_RE.match(self.text, self.pos)
+        return m.group(1) if m else None
+
+    def _consume(self):
+        self.pos = _TOKEN_RE.match(self.text, self.pos).end()
+
+    def _parse_level(self, level):
+        if level == len(self._LEVELS):
+            return self._parse_operand()
+        symbol, op_class = self._LEVELS[level]
+        first = self._parse_level(level + 1)
+        if first is None:
+            return None
+        tokens = [first]
+        while self._peek() == symbol:
+            self._consume()
+            arg = self._parse_level(level + 1)
+            if arg is None:
+                return None
+            tokens += [symbol, arg]
+        return first if len(tokens) == 1 else op_class([tokens])
+
+    def _parse_operand(self):
+        if self._peek() == "(":
+            self._consume()
+            expr = self._parse_level(0)
+            if expr is None or self._peek() != ")":
+                return None
+            self._consume()
+            return expr
+
+        m = _NUMBER_RE.match(self.text, self.pos)
+        if m:
+            self.pos = m.end()
+            return Number([t for t in m.groups() if t])
+
+        m = _GOAL_RE.match(self.text, self.pos)
+        if m is None:
+            return None
+        self.pos = m.end()
+        func, unit_type, agg_type, goal, bracket = m.groups()
+        tokens = [func, "(", UnitType([unit_type]), ".", AggType([agg_type]), ".", Goal([goal])]
+        if bracket == "(":
+            tokens.append("(")
+            while True:
+                m = _DIMENSION_RE.match(self.text, self.pos)
+                if m is None:
+                    return None
+                self.pos = m.end()
+                dimension, operator, value, delimiter = m.groups()
+                tokens += [Dimension([dimension]), DimensionValue([operator, value])]
+                if delimiter == ")" or self._peek() == ")":
+                    break
+            if delimiter == ",":
+                self._consume()
+            if self._peek() != ")":
+                return None
+            self._consume()
+            tokens.append(")")
+        tokens.append(")")
+        return EpGoal(tokens)
+
+
+def _parse_expression(expression: str, fast: bool = True):
+    """
+    Parses `expression` with `_FastParser` first and uses the pyparsing grammar only as a fallback
+    or when `fast` is off.
+    """
+    expr = _FastParser(expression).parse() if fast else None
+    if expr is None:
+        expr = _get_grammar().parseString(expression)[0]
+    return expr
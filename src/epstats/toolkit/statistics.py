@@ -1,4 +1,5 @@
 import warnings
+from functools import lru_cache
 from typing import Optional, Union
 
 import numpy as np
@@ -10,6 +11,33 @@ DEFAULT_CONFIDENCE_LEVEL = 0.95
 DEFAULT_POWER = 0.8
 
 
+def _normal_quantiles(alpha, power):
+    """
+    Quantiles $Z_{1-\\alpha/2}$ and $Z_{1-\\beta}$ of the standard normal distribution,
+    computed only once per scalar `alpha` and `power`, array arguments are not cached.
+    """
+    if np.ndim(alpha) == 0 and np.ndim(power) == 0:
+        return _scalar_normal_quantiles(float(alpha), float(power))
+    return st.norm.ppf(1 - alpha / 2), st.norm.ppf(power)
+
+
+@lru_cache(maxsize=256)
+def _scalar_normal_quantiles(alpha: float, power: float):
+    return float(st.norm.ppf(1 - alpha / 2)), float(st.norm.ppf(power))
+
+
+@lru_cache(maxsize=1024)
+def _obf_alpha_spending(confidence_level, total_length, actual_day):
+    """
+    See `Statistics.obf_alpha_spending_function`, cached for scalar arguments.
+    """
+    alpha = 1 - confidence_level
+    t = actual_day / total_length  # t in (0, 1]
+    q = st.norm.ppf(1 - alpha / 2)  # quantile of normal distribution
+    alpha_adj = 2 - 2 * st.norm.cdf(q / np.sqrt(t))
+    return np.round(1 - alpha_adj, decimals=4)
+
+
 class Statistics:
     """
     Various methods needed to evaluate experiment.
@@ -238,11 +266,10 @@ class Statistics:
             adjusted confidence level with respect to actual day of the experiment and total
             length of the experiment.
         """
-        alpha = 1 - confidence_level
-        t = actual_day / total_length  # t in (0, 1]
-        q = st.norm.ppf(1 - alpha / 2)  # quantile of normal distribution
-        alpha_adj = 2 - 2 * st.norm.cdf(q / np.sqrt(t))
-        return np.round(1 - alpha_adj, decimals=4)
+        if np.ndim(confidence_level) == 0 and np.ndim(total_length) == 0 and np.ndim(actual_day) == 0:
+            # 0-d arrays are not hashable
+            return _obf_alpha_spending(float(confidence_level), float(total_length), float(actual_day))
+        return _obf_alpha_spending.__wrapped__(confidence_level, total_length, actual_day)
 
     @staticmethod
     def required_sample_size_per_variant(
@@ -307,12 +334,59 @@ class Statistics:
 
         two_vars = 2 * (std**2) if std_2 is None else (std**2 + std_2**2)
         delta = np.float64(mean * minimum_effect)
+        return Statistics._required_sample_size(n_variants, delta, two_vars, confidence_level, power)
+
+    @staticmethod
+    def required_sample_size_per_variant_batch(
+        n_variants: int,
+        minimum_effect: np.array,
+        mean: np.array,
+        std: np.array,
+        std_2: Optional[np.array] = None,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+        power: float = DEFAULT_POWER,
+    ) -> np.array:
+        """
+        Computes the sample size required to reach the defined `confidence_level` and `power`
+        for many metrics at once.
 
+        Same as [`Statistics.required_sample_size_per_variant`][epstats.toolkit.statistics.Statistics.required_sample_size_per_variant]
+        but `minimum_effect`, `mean`, `std` and `std_2` are arrays of the same shape
+        evaluated element-wise with normal quantiles computed only once.
+
+        Arguments:
+            n_variants: number of variants in the experiment
+            minimum_effect: minimum (relative) effects that we find meaningful to detect
+            mean: estimates of the current population means
+            std: estimates of the current population standard deviations
+            std_2: estimates of the treatment population standard deviations
+            confidence_level: confidence level of the test
+            power: power of the test
+
+        Returns:
+            array of required sample sizes
+        """
+        minimum_effect = np.asarray(minimum_effect, dtype=np.float64)
+        if np.any(minimum_effect < 0):
+            raise ValueError("minimum_effect must be greater than zero.")
+
+        if n_variants < 2:
+            raise ValueError("There must be at least two variants.")
+
+        mean = np.asarray(mean, dtype=np.float64)
+        std = np.asarray(std, dtype=np.float64)
+        two_vars = 2 * (std**2) if std_2 is None else (std**2 + np.asarray(std_2, dtype=np.float64) ** 2)
+        delta = mean * minimum_effect
+        return Statistics._required_sample_size(n_variants, delta, two_vars, confidence_level, power)
+
+    @staticmethod
+    def _required_sample_size(n_variants, delta, two_vars, confidence_level, power):
         alpha = 1 - confidence_level
         m = n_variants - 1
         alpha = alpha / m  # Bonferroni correction
         # 7.84 for 80% power and 95% confidence, alpha / 2 for two-sided hypothesis
-        confidence_and_power = (st.norm.ppf(1 - alpha / 2) + st.norm.ppf(power)) ** 2
+        z_alpha, z_power = _normal_quantiles(alpha, power)
+        confidence_and_power = (z_alpha + z_power) ** 2
         with np.errstate(divide="ignore", invalid="ignore"):
             samples_size_per_variant = confidence_and_power * (two_vars / delta**2)
         return np.round(samples_size_per_variant)
@@ -428,10 +502,8 @@ class Statistics:
         required_sample_size_ratio = sample_size_per_variant / required_sample_size_per_variant
         alpha = (1 - required_confidence_level) / (n_variants - 1)
 
-        return st.norm.cdf(
-            np.sqrt(required_sample_size_ratio) * (st.norm.ppf(1 - alpha / 2) + st.norm.ppf(required_power))
-            - st.norm.ppf(1 - alpha / 2)
-        )
+        z_alpha, z_power = _normal_quantiles(alpha, required_power)
+        return st.norm.cdf(np.sqrt(required_sample_size_ratio) * (z_alpha + z_power) - z_alpha)
 
     @staticmethod
     def false_positive_risk(
@@ -1,8 +1,10 @@
 from .test_dao import TestDao, TestDaoFactory
 from .test_data import TestData
 from .utils import (
+    assert_check_values,
     assert_checks,
     assert_experiment,
+    assert_exposure_values,
     assert_exposures,
     assert_metrics,
     check_docstring,
@@ -15,8 +17,10 @@ __all__ = [
     "TestDao",
     "TestDaoFactory",
     "TestData",
+    "assert_check_values",
     "assert_checks",
     "assert_experiment",
+    "assert_exposure_values",
     "assert_exposures",
     "assert_metrics",
     "check_docstring",
@@ -1,9 +1,28 @@
+import numpy as np
 import pandas as pd
 
 from ..dao import Dao, DaoFactory
 from ..experiment import Evaluation, Experiment, FilterScope
 from .test_data import TestData
 
+# expected metric evaluations are wide, we load only columns that `assert_metrics` compares
+_EVALUATIONS_METRICS_COLUMNS = [
+    "exp_id",
+    "exp_variant_id",
+    "metric_id",
+    "sum_value",
+    "mean",
+    "diff",
+    "p_value",
+    "confidence_interval",
+    "confidence_level",
+    "minimum_effect",
+    "sample_size",
+    "required_sample_size",
+    "power",
+    "false_positive_risk",
+]
+
 
 class TestDao(Dao):
     def __init__(self, test_data: TestData):
@@ -12,9 +31,17 @@ class TestDao(Dao):
         self.test_data = test_data
         self.goals_agg = self.test_data.load_goals_agg()
         self.goals_unit = self.test_data.load_goals_by_unit()
+        # partition goals by experiment once so lookups do not need to scan the whole `exp_id` column
+        self._goals_agg_by_exp = dict(tuple(self.goals_agg.groupby("exp_id", sort=False)))
+        self._goals_unit_by_exp = dict(tuple(self.goals_unit.groupby("exp_id", sort=False)))
+        # expected evaluations are loaded lazily per experiment, only when asserted against
+        self._evaluations_metrics = {}
+        self._evaluations_checks = {}
+        self._evaluations_exposures = {}
+        self._variant_exposures = {}
 
     def get_agg_goals(self, experiment: Experiment) -> pd.DataFrame:
-        goals = self.goals_agg[self.goals_agg.exp_id == experiment.id]
+        goals = self._goals_agg_by_exp.get(experiment.id, self.goals_agg.iloc[:0])
 
         # We can call experiment in 3 ways:
         # 1. provide no `date_from` and `date_to` to evaluate all the experiment data regardless of any date range
@@ -33,23 +60,31 @@ class TestDao(Dao):
         if experiment.date_to is not None:
             goals = goals[goals.date <= experiment.date_to.strftime("%Y-%m-%d")]
 
+        # all filters are row-wise conditions, we combine them into a single mask and filter only once
+        is_exposure = (goals.goal == "exposure").to_numpy()
+        mask = np.ones(len(goals), dtype=bool)
         for f in experiment.filters:
             if f.scope == FilterScope.exposure:
-                goals = goals[(goals.goal != "exposure") | (goals[f.dimension].isin(f.value))]
+                mask &= ~is_exposure | self._dimension_isin(goals, f.dimension, f.value)
             if f.scope == FilterScope.goal:
-                goals = goals[(goals.goal == "exposure") | (goals[f.dimension].isin(f.value))]
+                mask &= is_exposure | self._dimension_isin(goals, f.dimension, f.value)
             if f.scope == FilterScope.trigger:
+                is_trigger = (goals.goal == f.goal).to_numpy()
                 if f.dimension and f.value:
-                    goals = goals[
-                        (goals.goal == "exposure") | ((goals.goal == f.goal) & (goals[f.dimension].isin(f.value)))
-                    ]
-                else:
-                    goals = goals[(goals.goal == "exposure") | (goals.goal == f.goal)]
+                    is_trigger &= self._dimension_isin(goals, f.dimension, f.value)
+                mask &= is_exposure | is_trigger
 
-        return goals
+        return goals[mask] if experiment.filters else goals
+
+    @staticmethod
+    def _dimension_isin(goals: pd.DataFrame, dimension: str, values) -> np.ndarray:
+        """
+        Boolean mask of `goals` rows by position, it does not rely on the index of `goals`.
+        """
+        return goals[dimension].isin(values).to_numpy()
 
     def get_unit_goals(self, experiment: Experiment) -> pd.DataFrame:
-        goals = self.goals_unit[self.goals_unit.exp_id == experiment.id]
+        goals = self._goals_unit_by_exp.get(experiment.id, self.goals_unit.iloc[:0])
 
         segments = []
 
@@ -78,13 +113,55 @@ class TestDao(Dao):
         return goals
 
     def load_evaluations_metrics(self, experiment_id: str) -> pd.DataFrame:
-        return self.test_data.load_evaluations_metrics(experiment_id)
+        """
+        Expected metric evaluations of the experiment indexed (and sorted) by `metric_id`.
+        """
+        if experiment_id not in self._evaluations_metrics:
+            self._evaluations_metrics[experiment_id] = (
+                self.test_data.load_evaluations_metrics(experiment_id, columns=_EVALUATIONS_METRICS_COLUMNS)
+                .set_index("metric_id", drop=False)
+                .sort_index(kind="stable")
+            )
+        return self._evaluations_metrics[experiment_id]
 
     def load_evaluations_checks(self, experiment_id: str) -> pd.DataFrame:
-        return self.test_data.load_evaluations_checks(experiment_id)
+        """
+        Expected check evaluations of the experiment indexed (and sorted) by `check_id`.
+        """
+        if experiment_id not in self._evaluations_checks:
+            self._evaluations_checks[experiment_id] = (
+                self.test_data.load_evaluations_checks(experiment_id)
+                .set_index("check_id", drop=False)
+                .sort_index(kind="stable")
+            )
+        return self._evaluations_checks[experiment_id]
 
     def load_evaluations_exposures(self, experiment_id: str) -> pd.DataFrame:
-        return self.test_data.load_evaluations_exposures(experiment_id)
+        """
+        Expected exposures of the experiment.
+        """
+        if experiment_id not in self._evaluations_exposures:
+            self._evaluations_exposures[experiment_id] = self.test_data.load_evaluations_exposures(experiment_id)
+        return self._evaluations_exposures[experiment_id]
+
+    def load_variant_exposures(self, experiment_id: str, unit_type: str, agg_type: str) -> pd.DataFrame:
+        """
+        Expected exposures of the experiment summed per variant with `exp_variant_id` and `exposures` columns.
+        """
+        key = (experiment_id, unit_type, agg_type)
+        if key not in self._variant_exposures:
+            exposures = self.load_evaluations_exposures(experiment_id)
+            self._variant_exposures[key] = (
+                exposures[
+                    (exposures.unit_type == unit_type)
+                    & (exposures.agg_type == agg_type)
+                    & (exposures.goal == "exposure")
+                ]
+                .groupby("exp_variant_id")
+                .agg(exposures=("count", "sum"))
+                .reset_index()
+            )
+        return self._variant_exposures[key]
 
 
 class TestDaoFactory(DaoFactory):
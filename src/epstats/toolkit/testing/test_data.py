@@ -1,4 +1,5 @@
 from importlib.resources import files
+from typing import List, Optional
 
 import pandas as pd
 
@@ -12,7 +13,7 @@ class TestData:
     """
 
     @classmethod
-    def load_goals_agg(cls, exp_id: str = None) -> pd.DataFrame:
+    def load_goals_agg(cls, exp_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load sample of aggregated test data to evaluate metrics. We use this dataset
         in unit testing and we are making it available here for other possible use-cases too.
@@ -21,13 +22,12 @@ class TestData:
 
         Arguments:
             exp_id: experiment id
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("goals_agg.csv")
-        goals_df = pd.read_csv(df_file)
-        return goals_df[goals_df.exp_id == exp_id] if exp_id is not None else goals_df
+        return cls._load("goals_agg.csv", exp_id, columns)
 
     @classmethod
-    def load_goals_simple_agg(cls) -> pd.DataFrame:
+    def load_goals_simple_agg(cls, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load sample of aggregated test data in simple wide format. File `goals_simple_agg.csv` contains only one
         experiment, so it is sufficient to just open it.
@@ -35,13 +35,27 @@ class TestData:
         We use this dataset in unit testing and we are making it available here for other possible use-cases too.
 
         See `load_evaluations` set of functions to load corresponding evaluation results.
+
+        Arguments:
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("goals_simple_agg.csv")
-        goals_df = pd.read_csv(df_file)
-        return goals_df
+        return cls._load("goals_simple_agg.csv", columns=columns)
+
+    @classmethod
+    def _load(
+        cls,
+        file_name: str,
+        exp_id: str = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        df_file = files(resources).joinpath(file_name)
+        # we parse only requested columns, `exp_id` is always needed to filter the experiment
+        usecols = None if columns is None else list(dict.fromkeys(columns + (["exp_id"] if exp_id is not None else [])))
+        data = pd.read_csv(df_file, usecols=usecols)
+        return data[data.exp_id == exp_id] if exp_id is not None else data
 
     @classmethod
-    def load_goals_by_unit(cls, exp_id: str = None) -> pd.DataFrame:
+    def load_goals_by_unit(cls, exp_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load sample of test data by unit to evaluate metrics. We use this dataset
         in unit testing and we are making it available here for other possible use-cases too.
@@ -50,13 +64,12 @@ class TestData:
 
         Arguments:
             exp_id: experiment id
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("goals_by_unit.csv")
-        goals_df = pd.read_csv(df_file)
-        return goals_df[goals_df.exp_id == exp_id] if exp_id is not None else goals_df
+        return cls._load("goals_by_unit.csv", exp_id, columns)
 
     @classmethod
-    def load_evaluations_checks(cls, exp_id: str = None) -> pd.DataFrame:
+    def load_evaluations_checks(cls, exp_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load checks (SRM) evaluations results. This data can be used to do asserts against
         after running evaluation on [pre-aggregated][epstats.toolkit.testing.test_data.TestData.load_goals_agg]
@@ -64,13 +77,12 @@ class TestData:
 
         Arguments:
             exp_id: experiment id
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("evaluations_checks.csv")
-        goals_df = pd.read_csv(df_file)
-        return goals_df[goals_df.exp_id == exp_id] if exp_id is not None else goals_df
+        return cls._load("evaluations_checks.csv", exp_id, columns)
 
     @classmethod
-    def load_evaluations_exposures(cls, exp_id: str = None) -> pd.DataFrame:
+    def load_evaluations_exposures(cls, exp_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load exposures evaluations results. This data can be used to do asserts against
         after running evaluation on [pre-aggregated][epstats.toolkit.testing.test_data.TestData.load_goals_agg]
@@ -78,13 +90,12 @@ class TestData:
 
         Arguments:
             exp_id: experiment id
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("evaluations_exposures.csv")
-        exposures_df = pd.read_csv(df_file)
-        return exposures_df[exposures_df.exp_id == exp_id] if exp_id is not None else exposures_df
+        return cls._load("evaluations_exposures.csv", exp_id, columns)
 
     @classmethod
-    def load_evaluations_metrics(cls, exp_id: str = None) -> pd.DataFrame:
+    def load_evaluations_metrics(cls, exp_id: str = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load metric evaluations results. This data can be used to do asserts against
         after running evaluation on [pre-aggregated][epstats.toolkit.testing.test_data.TestData.load_goals_agg]
@@ -92,7 +103,6 @@ class TestData:
 
         Arguments:
             exp_id: experiment id
+            columns: columns to load, all columns are loaded by default
         """
-        df_file = files(resources).joinpath("evaluations_metrics.csv")
-        goals_df = pd.read_csv(df_file)
-        return goals_df[goals_df.exp_id == exp_id] if exp_id is not None else goals_df
+        return cls._load("evaluations_metrics.csv", exp_id, columns)
@@ -1,3 +1,9 @@
+import re
+import textwrap
+import warnings
+from typing import Sequence
+
+import numpy as np
 import pandas as pd
 from numpy import allclose
 from numpy.testing import assert_array_almost_equal, assert_array_equal
@@ -6,10 +12,11 @@ from ..experiment import Evaluation, Experiment
 from .test_dao import TestDao
 from .test_data import TestData
 
+_PYTHON_CODE_BLOCK = re.compile(r"```python\n(.*?)```", re.DOTALL)
+
 
 def evaluate_experiment_agg(experiment: Experiment, test_dao: TestDao):
     goals = test_dao.get_agg_goals(experiment)
-    goals = goals[goals.exp_id == experiment.id]
 
     target = experiment.evaluate_agg(goals)
 
@@ -33,7 +40,6 @@ def evaluate_experiment_simple_agg(experiment: Experiment, test_dao: TestDao):
 
 def evaluate_experiment_by_unit(experiment: Experiment, test_dao: TestDao):
     goals = test_dao.get_unit_goals(experiment)
-    goals = goals[goals.exp_id == experiment.id]
 
     target = experiment.evaluate_by_unit(goals)
 
@@ -63,35 +69,32 @@ def assert_metrics(
 ) -> None:
     target = target[(target.exp_id == experiment_id) & (target.metric_id == metric_id)]
 
-    expected = test_dao.load_evaluations_metrics(experiment_id)
-    expected = expected[expected.metric_id == metric_id]
+    expected = test_dao.load_evaluations_metrics(experiment_id).loc[metric_id:metric_id]
 
     assert_array_equal(target.exp_variant_id, expected.exp_variant_id)
-    t = target[
-        [
-            "sum_value",
-            "diff",
-            "mean",
-            "p_value",
-            "confidence_interval",
-            "confidence_level",
-            "sample_size",
-            "required_sample_size",
-            "power",
-            "false_positive_risk",
-        ]
-    ].astype(float)
     atol = 10**-precision
-    assert allclose(t["sum_value"], expected["sum_value"], atol=atol, equal_nan=True)
-    assert allclose(t["diff"], expected["diff"], atol=atol, equal_nan=True)
-    assert allclose(t["mean"], expected["mean"], atol=atol, equal_nan=True)
-    assert allclose(t["p_value"], expected["p_value"], atol=atol * 10, equal_nan=True)
-    assert allclose(t["confidence_interval"], expected["confidence_interval"], atol=atol * 10, equal_nan=True)
-    assert allclose(t["confidence_level"], expected["confidence_level"], atol=atol, equal_nan=True)
-    assert allclose(t["sample_size"], expected["sample_size"], atol=0, equal_nan=True)
-    assert allclose(t["required_sample_size"], expected["required_sample_size"], atol=0, equal_nan=True)
-    assert allclose(t["power"], expected["power"], atol=atol, equal_nan=True)
-    assert allclose(t["false_positive_risk"], expected["false_positive_risk"], atol=atol, equal_nan=True)
+    # column name and its absolute tolerance, all columns are compared in one vectorized pass
+    tolerances = {
+        "sum_value": atol,
+        "diff": atol,
+        "mean": atol,
+        "p_value": atol * 10,
+        "confidence_interval": atol * 10,
+        "confidence_level": atol,
+        "sample_size": 0,
+        "required_sample_size": 0,
+        "power": atol,
+        "false_positive_risk": atol,
+    }
+    columns = list(tolerances.keys())
+    t = target[columns].to_numpy(dtype=float)
+    e = expected[columns].to_numpy(dtype=float)
+    tol = np.array(list(tolerances.values())) + 1e-05 * np.abs(e)
+    # same semantics as `numpy.allclose(..., equal_nan=True)` with default `rtol` and per-column `atol`,
+    # infinities match only the same infinity
+    with np.errstate(invalid="ignore"):
+        close = (t == e) | (np.isfinite(t) & np.isfinite(e) & (np.abs(t - e) <= tol)) | (np.isnan(t) & np.isnan(e))
+    assert close.all(), f"Columns {[c for c, ok in zip(columns, close.all(axis=0)) if not ok]} do not match"
 
     if "minimum_effect" in target.columns:
         assert allclose(target["minimum_effect"], expected["minimum_effect"], atol=0, equal_nan=True)
@@ -105,17 +108,31 @@ def assert_checks(
     precision: int = 4,
 ) -> None:
     target = target[(target.exp_id == experiment_id) & (target.check_id == check_id)]
+    assert_check_values(experiment_id, check_id, target.variable_id, target.value, test_dao, precision)
 
-    expected = test_dao.load_evaluations_checks(experiment_id)
-    expected = expected[expected.check_id == check_id]
 
-    assert_array_equal(target.check_id, expected.check_id)
-    for variable_id in expected["variable_id"].tolist():
-        assert_array_almost_equal(
-            target[target["variable_id"] == variable_id]["value"],
-            expected[expected["variable_id"] == variable_id]["value"],
-            precision,
-        )
+def assert_check_values(
+    experiment_id: str,
+    check_id: int,
+    variable_ids: Sequence[str],
+    values: Sequence[float],
+    test_dao: TestDao,
+    precision: int = 4,
+) -> None:
+    """
+    Same as `assert_checks` but takes check variables and their values directly
+    instead of a data frame with evaluated checks.
+    """
+    expected = test_dao.load_evaluations_checks(experiment_id).loc[check_id:check_id]
+
+    assert sorted(variable_ids) == sorted(expected.variable_id), f"Check {check_id} has different variables"
+    # align target values to expected ones by `variable_id` and compare them all at once
+    target_values = dict(zip(variable_ids, values))
+    assert_array_almost_equal(
+        np.array([target_values[v] for v in expected.variable_id], dtype=float),
+        expected.value.to_numpy(dtype=float),
+        precision,
+    )
 
 
 def assert_exposures(
@@ -125,30 +142,43 @@ def assert_exposures(
     unit_type: str = "test_unit_type",
     agg_type: str = "global",
 ) -> None:
-    expected = test_dao.load_evaluations_exposures(experiment_id)
-    expected = (
-        expected[(expected.unit_type == unit_type) & (expected.agg_type == agg_type) & (expected.goal == "exposure")]
-        .groupby("exp_variant_id")
-        .agg(exposures=("count", "sum"))
-        .reset_index()
-    )
+    assert_exposure_values(experiment_id, target.exp_variant_id, target.exposures, test_dao, unit_type, agg_type)
 
-    assert_array_equal(target.exp_variant_id, expected.exp_variant_id)
-    assert_array_equal(target.exposures, expected.exposures)
 
+def assert_exposure_values(
+    experiment_id: str,
+    exp_variant_ids: Sequence[str],
+    exposures: Sequence[int],
+    test_dao: TestDao,
+    unit_type: str = "test_unit_type",
+    agg_type: str = "global",
+) -> None:
+    """
+    Same as `assert_exposures` but takes variants and their exposures directly
+    instead of a data frame with evaluated exposures.
+    """
+    expected = test_dao.load_variant_exposures(experiment_id, unit_type, agg_type)
+
+    assert_array_equal(exp_variant_ids, expected.exp_variant_id)
+    assert_array_equal(exposures, expected.exposures)
 
-def check_docstring(doc, indent):
+
+def check_docstring(doc, indent=None):
     """
     This function will read through the docstring and grab
     the first python code block. It will try to execute it.
     If it fails, the calling test should raise a flag.
+
+    The code block is dedented as a whole, `indent` is deprecated and ignored.
     """
+    if indent is not None:
+        warnings.warn(
+            "`indent` argument of `check_docstring` is deprecated and ignored.", DeprecationWarning, stacklevel=2
+        )
     if not doc:
         return
-    start = doc.find("```python\n")
-    end = doc.find("```\n")
-    if start != -1:
-        if end != -1:
-            code_part = doc[(start + 10) : end].replace(" " * indent, "")  # noqa: E203
-            print(code_part)
-            exec(code_part)  # noqa: S102
+    match = _PYTHON_CODE_BLOCK.search(doc)
+    if match is not None:
+        code_part = textwrap.dedent(match.group(1))
+        print(code_part)
+        exec(code_part)  # noqa: S102
@@ -1,10 +1,12 @@
+from datetime import timezone
+
 import pandas as pd
-import pytz
 
 
 def get_utc_timestamp(dt):
-    mytz = pytz.timezone("UTC")
-    return mytz.normalize(mytz.localize(dt, is_dst=False))
+    if dt.tzinfo is not None:
+        raise ValueError("Not naive datetime (tzinfo is already set)")
+    return dt.replace(tzinfo=timezone.utc)
 
 
 def goals_wide_to_long(wide_df: pd.DataFrame, unit_type: str = "test_unit_type") -> pd.DataFrame:
@@ -28,10 +30,8 @@ def goals_wide_to_long(wide_df: pd.DataFrame, unit_type: str = "test_unit_type")
     ```
     """
 
-    # Do not modify the input `df` via reference
-    wide_df = wide_df.copy()
-    # Rename first two columns
-    wide_df.columns = ["exp_id", "exp_variant_id"] + wide_df.columns.to_list()[2:]
+    # Rename first two columns, `rename` returns a new frame so the input `df` is not modified via reference
+    wide_df = wide_df.rename(columns=dict(zip(wide_df.columns[:2], ["exp_id", "exp_variant_id"])))
 
     # DataFrame `sum_value` to long format
     # Select non squared columns and switch from long to wide
@@ -54,13 +54,31 @@ def goals_wide_to_long(wide_df: pd.DataFrame, unit_type: str = "test_unit_type")
 
     # Merge together and add other necessary columns for evaluation
     goals = df_long.merge(right=df_long_sqr, how="outer", on=["exp_id", "exp_variant_id", "goal"])
-    goals.insert(2, "unit_type", unit_type)
-    goals.insert(3, "agg_type", "global")
-    goals.insert(5, "dimension", "")
-    goals.insert(6, "dimension_value", "")
-    goals.insert(7, "count", 0)
-    goals.insert(8, "sum_sqr_count", 0)
-    goals.insert(11, "count_unique", 0)
+    # Add all constant columns at once and reorder them in a single step
+    goals = goals.assign(
+        unit_type=unit_type,
+        agg_type="global",
+        dimension="",
+        dimension_value="",
+        count=0,
+        sum_sqr_count=0,
+        count_unique=0,
+    )[
+        [
+            "exp_id",
+            "exp_variant_id",
+            "unit_type",
+            "agg_type",
+            "goal",
+            "dimension",
+            "dimension_value",
+            "count",
+            "sum_sqr_count",
+            "sum_value",
+            "sum_sqr_value",
+            "count_unique",
+        ]
+    ]
     goals["sum_sqr_value"] = goals.apply(_add_value_squared_where_missing, axis="columns")
 
     return goals
@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from src.epstats.main import get_dao, get_executor_pool, metrics_app
+from src.epstats.server import ApiSettings, get_api
+
+from .depend import dao_factory, get_test_dao, get_test_executor_pool
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    api = get_api(ApiSettings(validation_endpoint=True), get_dao, get_executor_pool)
+    api.mount("/metrics", metrics_app)
+    api.dependency_overrides[get_dao] = get_test_dao
+    api.dependency_overrides[get_executor_pool] = get_test_executor_pool
+    with TestClient(api) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def post_concurrently(client):
+    """
+    Function posting all json blobs to `url` at once, responses are returned under the same keys as blobs.
+    """
+
+    def post(url: str, json_blobs: dict) -> dict:
+        async def post_all():
+            transport = httpx.ASGITransport(app=client.app)
+            async with httpx.AsyncClient(transport=transport, base_url=str(client.base_url)) as async_client:
+                return await asyncio.gather(
+                    *[
+                        async_client.post(url, content=orjson.dumps(b), headers=JSON_HEADERS)
+                        for b in json_blobs.values()
+                    ]
+                )
+
+        return dict(zip(json_blobs.keys(), asyncio.run(post_all())))
+
+    return post
+
+
+@pytest.fixture(scope="session")
+def test_dao():
+    return dao_factory.get_dao()
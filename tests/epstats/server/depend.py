@@ -1,9 +1,15 @@
+import atexit
+import os
 from concurrent.futures import ThreadPoolExecutor
 
 from src.epstats.toolkit.testing import TestDaoFactory, TestData
 
 dao_factory = TestDaoFactory(TestData())
 
+# one pool for the whole test session so concurrent requests do not spawn new threads
+evaluation_pool = ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 2))
+atexit.register(evaluation_pool.shutdown)
+
 
 def get_test_dao():
     dao = dao_factory.get_dao()
@@ -14,8 +20,4 @@ def get_test_dao():
 
 
 def get_test_executor_pool():
-    evaluation_pool = ThreadPoolExecutor(max_workers=1)
-    try:
-        yield evaluation_pool
-    finally:
-        pass
+    yield evaluation_pool
@@ -1,379 +1,306 @@
 import pandas as pd
-from epstats.server.req import Experiment
-from fastapi.testclient import TestClient
+import pytest
+from pydantic import TypeAdapter
 
-from src.epstats.main import api, get_dao, get_executor_pool
+from src.epstats.server.req import Experiment
 from src.epstats.server.res import Result
 from src.epstats.toolkit.testing import (
     TestDao,
-    assert_checks,
-    assert_exposures,
+    assert_check_values,
+    assert_exposure_values,
     assert_metrics,
 )
 
-from .depend import dao_factory, get_test_dao, get_test_executor_pool
-
-client = TestClient(api)
-api.dependency_overrides[get_dao] = get_test_dao
-api.dependency_overrides[get_executor_pool] = get_test_executor_pool
-
-
-def test_conversion_evaluate():
-    json_blob = {
-        "id": "test-conversion",
-        "control_variant": "a",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Click-through Rate",
-                "nominator": "count(test_unit_type.unit.click)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-        "checks": [
-            {
-                "id": 1,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    Experiment.model_validate(json_blob)
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 1)
-
-
-def test_real_valued_evaluate():
-    json_blob = {
-        "id": "test-real-valued",
-        "control_variant": "a",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 2,
-                "name": "Average Bookings",
-                "nominator": "value(test_unit_type.unit.conversion)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-        "checks": [
-            {
-                "id": 1,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 1)
-
-
-def test_multiple_evaluate():
-    json_blob = {
-        "id": "test-multiple",
-        "control_variant": "a",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Click-through Rate",
-                "nominator": "count(test_unit_type.unit.click)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-            {
-                "id": 2,
-                "name": "Average Bookings",
-                "nominator": "value(test_unit_type.unit.conversion)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-        ],
-        "checks": [
-            {
-                "id": 1,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 2)
-
-
-def test_sequential():
-    json_blob = {
-        "id": "test-sequential-v2",
-        "control_variant": "a",
-        "date_from": "2020-01-01",
-        "date_to": "2020-01-14",
-        "date_for": "2020-01-10",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Average Bookings",
-                "nominator": "value(test_unit_type.unit.conversion)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-        ],
-        "checks": [],
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), expected_metrics=1, expected_checks=0)
-
-    json_blob = {
-        "id": "test-sequential-v3",
-        "control_variant": "a",
-        "date_from": "2020-01-01",
-        "date_to": "2020-01-14",
-        "date_for": "2020-01-14",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Average Bookings",
-                "nominator": "value(test_unit_type.unit.conversion)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-        ],
-        "checks": [],
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), expected_metrics=1, expected_checks=0)
-
-
-def test_dimension_evaluate():
-    json_blob = {
-        "id": "test-dimension",
-        "control_variant": "a",
-        "variants": ["a", "b"],
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Views per User of Screen button-1",
-                "nominator": "count(test_unit_type.unit.view(element=button-1))",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-            {
-                "id": 2,
-                "name": "Views per User of Screen button-%",
-                "nominator": "count(test_unit_type.unit.view(element=button-%))",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-        ],
-        "checks": [
-            {
-                "id": 1,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 2)
-
-
-def test_filter_scope_goal():
-    json_blob = {
-        "id": "test-dimension",
-        "control_variant": "a",
-        "variants": ["a", "b"],
-        "unit_type": "test_unit_type",
-        "filters": [
-            {
-                "dimension": "element",
-                "value": ["button-1"],
-                "scope": "goal",
-            },
-        ],
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Views per User of Screen S",
-                "nominator": "count(test_unit_type.unit.view)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-        "checks": [
-            {
-                "id": 1,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 1)
-
-
-def test_sum_ratio_check():
-    json_blob = {
-        "id": "test-sum-ratio",
-        "control_variant": "a",
-        "variants": ["a", "b", "c"],
-        "unit_type": "test_unit_type",
-        "filters": [],
-        "metrics": [],
-        "checks": [
-            {
-                "id": 1,
-                "name": "EVA",
-                "type": "SumRatio",
-                "nominator": "count(test_unit_type.global.inconsistent_exposure)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            }
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert_experiment(resp.json(), dao_factory.get_dao(), 0)
-
-
-def test_multi_check():
-    json_blob = {
-        "id": "test-multi-check",
-        "control_variant": "a",
-        "variants": ["a", "b", "c"],
-        "unit_type": "test_unit_type",
-        "filters": [],
-        "metrics": [],
-        "checks": [
-            {
-                "id": 1,
-                "name": "EVA",
-                "type": "SumRatio",
-                "nominator": "count(test_unit_type.global.inconsistent_exposure)",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-            {
-                "id": 2,
-                "name": "SRM",
-                "denominator": "count(test_unit_type.global.exposure)",
-            },
-        ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert_experiment(resp.json(), dao_factory.get_dao(), 0, 2)
-
-
-def test_metric_with_minimum_effect():
-    json_blob = {
-        "id": "test-conversion-with-minimum-effect",
-        "control_variant": "a",
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Click-through Rate",
-                "nominator": "count(test_unit_type.unit.click)",
-                "denominator": "count(test_unit_type.global.exposure)",
-                "minimum_effect": 0.1,
-            }
-        ],
-        "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 1, 0)
-
-
-def test_false_positive_risk():
-    json_blob = {
-        "id": "test-false-positive-risk",
-        "control_variant": "a",
-        "variants": ["a", "b"],
-        "unit_type": "test_unit_type",
-        "metrics": [
-            {
-                "id": 1,
-                "name": "Views per User of Screen button-1",
-                "nominator": "count(test_unit_type.unit.view(element=button-1))",
-                "denominator": "count(test_unit_type.global.exposure)",
-                "minimum_effect": 0.05,
-            },
-            {
-                "id": 2,
-                "name": "Views per User of Screen button-%",
-                "nominator": "count(test_unit_type.unit.view(element=button-%))",
-                "denominator": "count(test_unit_type.global.exposure)",
-                "minimum_effect": 0.05,
-            },
-        ],
-        "checks": [],
-        "null_hypothesis_rate": 0.1,
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
+# all API tests share the session client, dao and executor pool, so they run in the same worker
+pytestmark = pytest.mark.xdist_group("api")
+
+CONVERSION = {
+    "id": "test-conversion",
+    "control_variant": "a",
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Click-through Rate",
+            "nominator": "count(test_unit_type.unit.click)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+    "checks": [
+        {
+            "id": 1,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+REAL_VALUED = {
+    "id": "test-real-valued",
+    "control_variant": "a",
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 2,
+            "name": "Average Bookings",
+            "nominator": "value(test_unit_type.unit.conversion)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+    "checks": [
+        {
+            "id": 1,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+MULTIPLE = {
+    "id": "test-multiple",
+    "control_variant": "a",
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Click-through Rate",
+            "nominator": "count(test_unit_type.unit.click)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+        {
+            "id": 2,
+            "name": "Average Bookings",
+            "nominator": "value(test_unit_type.unit.conversion)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+    ],
+    "checks": [
+        {
+            "id": 1,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+SEQUENTIAL_V2 = {
+    "id": "test-sequential-v2",
+    "control_variant": "a",
+    "date_from": "2020-01-01",
+    "date_to": "2020-01-14",
+    "date_for": "2020-01-10",
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Average Bookings",
+            "nominator": "value(test_unit_type.unit.conversion)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+    ],
+    "checks": [],
+}
+
+SEQUENTIAL_V3 = {**SEQUENTIAL_V2, "id": "test-sequential-v3", "date_for": "2020-01-14"}
+
+DIMENSION = {
+    "id": "test-dimension",
+    "control_variant": "a",
+    "variants": ["a", "b"],
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Views per User of Screen button-1",
+            "nominator": "count(test_unit_type.unit.view(element=button-1))",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+        {
+            "id": 2,
+            "name": "Views per User of Screen button-%",
+            "nominator": "count(test_unit_type.unit.view(element=button-%))",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+    ],
+    "checks": [
+        {
+            "id": 1,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+FILTER_SCOPE_GOAL = {
+    "id": "test-dimension",
+    "control_variant": "a",
+    "variants": ["a", "b"],
+    "unit_type": "test_unit_type",
+    "filters": [
+        {
+            "dimension": "element",
+            "value": ["button-1"],
+            "scope": "goal",
+        },
+    ],
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Views per User of Screen S",
+            "nominator": "count(test_unit_type.unit.view)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+    "checks": [
+        {
+            "id": 1,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+SUM_RATIO_CHECK = {
+    "id": "test-sum-ratio",
+    "control_variant": "a",
+    "variants": ["a", "b", "c"],
+    "unit_type": "test_unit_type",
+    "filters": [],
+    "metrics": [],
+    "checks": [
+        {
+            "id": 1,
+            "name": "EVA",
+            "type": "SumRatio",
+            "nominator": "count(test_unit_type.global.inconsistent_exposure)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        }
+    ],
+}
+
+MULTI_CHECK = {
+    "id": "test-multi-check",
+    "control_variant": "a",
+    "variants": ["a", "b", "c"],
+    "unit_type": "test_unit_type",
+    "filters": [],
+    "metrics": [],
+    "checks": [
+        {
+            "id": 1,
+            "name": "EVA",
+            "type": "SumRatio",
+            "nominator": "count(test_unit_type.global.inconsistent_exposure)",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+        {
+            "id": 2,
+            "name": "SRM",
+            "denominator": "count(test_unit_type.global.exposure)",
+        },
+    ],
+}
+
+MINIMUM_EFFECT = {
+    "id": "test-conversion-with-minimum-effect",
+    "control_variant": "a",
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Click-through Rate",
+            "nominator": "count(test_unit_type.unit.click)",
+            "denominator": "count(test_unit_type.global.exposure)",
+            "minimum_effect": 0.1,
+        }
+    ],
+    "checks": [],
+}
+
+FALSE_POSITIVE_RISK = {
+    "id": "test-false-positive-risk",
+    "control_variant": "a",
+    "variants": ["a", "b"],
+    "unit_type": "test_unit_type",
+    "metrics": [
+        {
+            "id": 1,
+            "name": "Views per User of Screen button-1",
+            "nominator": "count(test_unit_type.unit.view(element=button-1))",
+            "denominator": "count(test_unit_type.global.exposure)",
+            "minimum_effect": 0.05,
+        },
+        {
+            "id": 2,
+            "name": "Views per User of Screen button-%",
+            "nominator": "count(test_unit_type.unit.view(element=button-%))",
+            "denominator": "count(test_unit_type.global.exposure)",
+            "minimum_effect": 0.05,
+        },
+    ],
+    "checks": [],
+    "null_hypothesis_rate": 0.1,
+}
+
+# validators are built once and reused by all test cases
+EXPERIMENT_ADAPTER = TypeAdapter(Experiment)
+RESULT_ADAPTER = TypeAdapter(Result)
+
+EVALUATE_CASES = [
+    pytest.param(CONVERSION, 1, 1, id="conversion"),
+    pytest.param(REAL_VALUED, 1, 1, id="real_valued"),
+    pytest.param(MULTIPLE, 2, 1, id="multiple"),
+    pytest.param(SEQUENTIAL_V2, 1, 0, id="sequential_v2"),
+    pytest.param(SEQUENTIAL_V3, 1, 0, id="sequential_v3"),
+    pytest.param(DIMENSION, 2, 1, id="dimension"),
+    pytest.param(FILTER_SCOPE_GOAL, 1, 1, id="filter_scope_goal"),
+    pytest.param(SUM_RATIO_CHECK, 0, 1, id="sum_ratio_check"),
+    pytest.param(MULTI_CHECK, 0, 2, id="multi_check"),
+    pytest.param(MINIMUM_EFFECT, 1, 0, id="minimum_effect"),
+    pytest.param(FALSE_POSITIVE_RISK, 2, 0, id="false_positive_risk"),
+]
+
+
+@pytest.fixture(scope="module")
+def evaluate_responses(post_concurrently):
+    """
+    Evaluates all `EVALUATE_CASES` concurrently, responses are keyed by the case id.
+    """
+    return post_concurrently("/evaluate", {case_id: json_blob for (json_blob, _, _), _, case_id in EVALUATE_CASES})
+
+
+@pytest.mark.parametrize("json_blob, expected_metrics, expected_checks", EVALUATE_CASES)
+def test_evaluate(request, evaluate_responses, test_dao, json_blob, expected_metrics, expected_checks):
+    EXPERIMENT_ADAPTER.validate_python(json_blob)
+    resp = evaluate_responses[request.node.callspec.id]
     assert resp.status_code == 200
-    assert_experiment(resp.json(), dao_factory.get_dao(), 2, 0)
+    assert_experiment(resp.json(), test_dao, expected_metrics, expected_checks)
 
 
-def test_prometheus_metrics():
+def test_prometheus_metrics(client):
     prometheus_resp = client.get("/metrics")
     assert prometheus_resp.status_code == 200
     assert "evaluation_duration_seconds" in prometheus_resp.text
 
 
 def assert_experiment(target, test_dao: TestDao, expected_metrics: int, expected_checks: int = 1) -> None:
-    result = Result(**target)
+    result = RESULT_ADAPTER.validate_python(target)
     assert len(result.metrics) == expected_metrics
     assert len(result.checks) == expected_checks
 
     for m in target["metrics"]:
         assert len(m["stats"]) >= 2
-        d = {
-            "exp_variant_id": [],
-            "diff": [],
-            "mean": [],
-            "std": [],
-            "sum_value": [],
-            "p_value": [],
-            "confidence_interval": [],
-            "confidence_level": [],
-            "sample_size": [],
-            "required_sample_size": [],
-            "power": [],
-            "false_positive_risk": [],
-        }
-        for s in m["stats"]:
-            for i in s.items():
-                d[i[0]].append(i[1])
-
-        metric_df = pd.DataFrame(d)
+        metric_df = pd.DataFrame(m["stats"])
         metric_df["exp_id"] = target["id"]
         metric_df["metric_id"] = m["id"]
         assert_metrics(target["id"], m["id"], metric_df, test_dao)
 
     for m in target["checks"]:
-        d = {"variable_id": [], "value": []}
-        for s in m["stats"]:
-            for i in s.items():
-                d[i[0]].append(i[1])
-        metric_df = pd.DataFrame(d)
-        metric_df["exp_id"] = target["id"]
-        metric_df["check_id"] = m["id"]
-        assert_checks(target["id"], m["id"], metric_df, test_dao)
-
-    m = target["exposure"]
-    d = {"exp_variant_id": [], "exposures": []}
-    for s in m["stats"]:
-        d["exp_variant_id"].append(s["exp_variant_id"])
-        d["exposures"].append(s["count"])
-    metric_df = pd.DataFrame(d)
-    metric_df["exp_id"] = target["id"]
-    assert_exposures(target["id"], metric_df, test_dao, unit_type="test_unit_type", agg_type="global")
+        variable_ids = [s["variable_id"] for s in m["stats"]]
+        values = [s["value"] for s in m["stats"]]
+        assert_check_values(target["id"], m["id"], variable_ids, values, test_dao)
+
+    exposure_stats = target["exposure"]["stats"]
+    exp_variant_ids = [s["exp_variant_id"] for s in exposure_stats]
+    exposures = [s["count"] for s in exposure_stats]
+    assert_exposure_values(target["id"], exp_variant_ids, exposures, test_dao, "test_unit_type", "global")
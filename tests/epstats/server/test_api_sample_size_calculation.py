@@ -1,27 +1,24 @@
 from math import isnan
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 
-from src.epstats.main import api, get_executor_pool
+from .conftest import JSON_HEADERS
 
-from .depend import get_test_executor_pool
+# all API tests share the session client, dao and executor pool, so they run in the same worker
+pytestmark = pytest.mark.xdist_group("api")
 
-client = TestClient(api)
-api.dependency_overrides[get_executor_pool] = get_test_executor_pool
+SAMPLE_SIZE_CASES = [
+    (2, 0.10, 0.2, 1.2, 56512),
+    (2, 0.05, 0.4, None, 9489),
+    (3, 0.05, 0.4, None, 11492),
+    (2, 0.1, 0, 0, float("nan")),
+    (2, 0.1, 0, 1, float("inf")),
+]
 
 
-@pytest.mark.parametrize(
-    "n_variants, minimum_effect, mean, std, expected",
-    [
-        (2, 0.10, 0.2, 1.2, 56512),
-        (2, 0.05, 0.4, None, 9489),
-        (3, 0.05, 0.4, None, 11492),
-        (2, 0.1, 0, 0, float("nan")),
-        (2, 0.1, 0, 1, float("inf")),
-    ],
-)
-def test_sample_size_calculation(n_variants, minimum_effect, mean, std, expected):
+@pytest.mark.parametrize("n_variants, minimum_effect, mean, std, expected", SAMPLE_SIZE_CASES)
+def test_sample_size_calculation(client, n_variants, minimum_effect, mean, std, expected):
     json_blob = {
         "minimum_effect": minimum_effect,
         "mean": mean,
@@ -29,7 +26,7 @@ def test_sample_size_calculation(n_variants, minimum_effect, mean, std, expected
         "n_variants": n_variants,
     }
 
-    resp = client.post("/sample-size-calculation", json=json_blob)
+    resp = client.post("/sample-size-calculation", content=orjson.dumps(json_blob), headers=JSON_HEADERS)
     assert resp.status_code == 200
 
     sample_size = resp.json()["sample_size_per_variant"]
@@ -37,6 +34,27 @@ def test_sample_size_calculation(n_variants, minimum_effect, mean, std, expected
     assert sample_size == expected or (isnan(expected) and isnan(sample_size))
 
 
+def test_sample_size_calculation_batch(client):
+    json_blob = [
+        {
+            "minimum_effect": minimum_effect,
+            "mean": mean,
+            "std": std,
+            "n_variants": n_variants,
+        }
+        for n_variants, minimum_effect, mean, std, _ in SAMPLE_SIZE_CASES
+    ]
+
+    resp = client.post("/sample-size-calculation/batch", content=orjson.dumps(json_blob), headers=JSON_HEADERS)
+    assert resp.status_code == 200
+
+    results = resp.json()
+    assert len(results) == len(SAMPLE_SIZE_CASES)
+    for result, (*_, expected) in zip(results, SAMPLE_SIZE_CASES):
+        sample_size = result["sample_size_per_variant"]
+        assert sample_size == expected or (isnan(expected) and isnan(sample_size))
+
+
 @pytest.mark.parametrize(
     "n_variants, minimum_effect, mean, expected_message",
     [
@@ -45,13 +63,24 @@ def test_sample_size_calculation(n_variants, minimum_effect, mean, std, expected
         (1, 0.05, 0.2, "must be at least two variants"),
     ],
 )
-def test_sample_size_calculation_error(n_variants, minimum_effect, mean, expected_message):
+def test_sample_size_calculation_error(client, n_variants, minimum_effect, mean, expected_message):
     json_blob = {
         "minimum_effect": minimum_effect,
         "mean": mean,
         "n_variants": n_variants,
     }
 
-    resp = client.post("/sample-size-calculation", json=json_blob)
+    resp = client.post("/sample-size-calculation", content=orjson.dumps(json_blob), headers=JSON_HEADERS)
     assert resp.status_code == 500
     assert expected_message in resp.content.decode()
+
+
+def test_sample_size_calculation_batch_error(client):
+    json_blob = [
+        {"minimum_effect": 0.05, "mean": 0.4, "n_variants": 2},
+        {"minimum_effect": -0.4, "mean": 0.2, "n_variants": 2},
+    ]
+
+    resp = client.post("/sample-size-calculation/batch", content=orjson.dumps(json_blob), headers=JSON_HEADERS)
+    assert resp.status_code == 500
+    assert "minimum_effect must be greater than zero" in resp.content.decode()
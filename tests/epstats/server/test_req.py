@@ -1,16 +1,10 @@
-from fastapi.testclient import TestClient
+import pytest
 
-from src.epstats.main import api, get_dao, get_executor_pool
+# all API tests share the session client, dao and executor pool, so they run in the same worker
+pytestmark = pytest.mark.xdist_group("api")
 
-from .depend import get_test_dao, get_test_executor_pool
-
-client = TestClient(api)
-api.dependency_overrides[get_dao] = get_test_dao
-api.dependency_overrides[get_executor_pool] = get_test_executor_pool
-
-
-def test_validate_control_variant():
-    json_blob = {
+REQUESTS = {
+    "control_variant": {
         "id": "test-conversions",
         "controlvariant": "a",
         "metrics": [
@@ -22,17 +16,8 @@ def test_validate_control_variant():
             }
         ],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][1] == "control_variant"
-    assert json["detail"][0]["type"] == "missing"
-
-
-def test_validate_metric_nominator():
-    json_blob = {
+    },
+    "metric_nominator": {
         "id": "test-binary",
         "control_variant": "a",
         "unit_type": "test_unit_type",
@@ -45,17 +30,8 @@ def test_validate_metric_nominator():
             }
         ],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][3] == "nominator"
-    assert json["detail"][0]["type"] == "missing"
-
-
-def test_validate_metric_denominator():
-    json_blob = {
+    },
+    "metric_denominator": {
         "id": "test-conversions",
         "control_variant": "a",
         "unit_type": "test_unit_type",
@@ -68,17 +44,8 @@ def test_validate_metric_denominator():
             }
         ],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][3] == "denominator"
-    assert json["detail"][0]["type"] == "missing"
-
-
-def test_validate_default_check_type():
-    json_blob = {
+    },
+    "default_check_type": {
         "id": "test-conversions",
         "control_variant": "a",
         "unit_type": "test_unit_type",
@@ -90,14 +57,8 @@ def test_validate_default_check_type():
                 "denominator": "count(test_unit_type.global.exposure)",
             },
         ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-
-
-def test_validate_sum_ratio_nominator():
-    json_blob = {
+    },
+    "sum_ratio_nominator": {
         "id": "test-conversions",
         "control_variant": "a",
         "unit_type": "test_unit_type",
@@ -110,18 +71,8 @@ def test_validate_sum_ratio_nominator():
                 "denominator": "count(test_unit_type.global.exposure)",
             },
         ],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][1] == "checks"
-    assert json["detail"][0]["loc"][1] == "checks"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_validate_metric_parsing():
-    json_blob = {
+    },
+    "metric_parsing": {
         "id": "test-conversions",
         "control_variant": "a",
         "unit_type": "test_unit_type",
@@ -134,17 +85,8 @@ def test_validate_metric_parsing():
             }
         ],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][1] == "metrics"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_date_parsing():
-    json_blob = {
+    },
+    "date_parsing_valid": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-01",
@@ -153,11 +95,8 @@ def test_date_parsing():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-
-    json_blob = {
+    },
+    "date_parsing_invalid": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-40",
@@ -165,19 +104,8 @@ def test_date_parsing():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][1] == "date_from"
-    assert json["detail"][0]["type"] == "value_error"
-    assert json["detail"][1]["loc"][1] == "date_to"
-    assert json["detail"][1]["type"] == "value_error"
-
-
-def test_validate_date_to_ge_from():
-    json_blob = {
+    },
+    "date_to_ge_from": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-02",
@@ -185,16 +113,8 @@ def test_validate_date_to_ge_from():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_validate_date_for_requires_date_to_and_date_for():
-    json_blob = {
+    },
+    "date_for_without_date_to": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-01",
@@ -202,14 +122,8 @@ def test_validate_date_for_requires_date_to_and_date_for():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-    json_blob = {
+    },
+    "date_for_without_date_from": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_for": "2020-01-01",
@@ -217,16 +131,8 @@ def test_validate_date_for_requires_date_to_and_date_for():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_validate_date_for_between_date_to_and_date_for():
-    json_blob = {
+    },
+    "date_for_after_date_to": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-01",
@@ -235,14 +141,8 @@ def test_validate_date_for_between_date_to_and_date_for():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-    json_blob = {
+    },
+    "date_for_before_date_from": {
         "id": "test-conversions",
         "control_variant": "a",
         "date_from": "2020-01-05",
@@ -251,16 +151,8 @@ def test_validate_date_for_between_date_to_and_date_for():
         "metrics": [],
         "checks": [],
         "unit_type": "test_unit_type",
-    }
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_filter_scope_trigger_empty_goal():
-    json_blob = {
+    },
+    "trigger_empty_goal": {
         "id": "test-trigger",
         "control_variant": "a",
         "variants": ["a", "b"],
@@ -270,17 +162,8 @@ def test_filter_scope_trigger_empty_goal():
         ],
         "metrics": [],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
-
-
-def test_filter_scope_trigger_empty_dimension():
-    json_blob = {
+    },
+    "trigger_empty_dimension": {
         "id": "test-trigger",
         "control_variant": "a",
         "variants": ["a", "b"],
@@ -290,14 +173,8 @@ def test_filter_scope_trigger_empty_dimension():
         ],
         "metrics": [],
         "checks": [],
-    }
-
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 200
-
-
-def test_filter_scope_exposure_empty_dimension():
-    json_blob = {
+    },
+    "exposure_empty_dimension": {
         "id": "test-trigger",
         "control_variant": "a",
         "variants": ["a", "b"],
@@ -307,10 +184,93 @@ def test_filter_scope_exposure_empty_dimension():
         ],
         "metrics": [],
         "checks": [],
+    },
+}
+
+
+# valid requests are evaluated, invalid ones go to the validation-only endpoint
+# except `control_variant` that checks `/evaluate` rejects invalid requests too
+EVALUATED = {"default_check_type", "date_parsing_valid", "trigger_empty_dimension", "control_variant"}
+
+
+@pytest.fixture(scope="module")
+def responses(post_concurrently):
+    return {
+        **post_concurrently("/evaluate", {k: v for k, v in REQUESTS.items() if k in EVALUATED}),
+        **post_concurrently("/validate", {k: v for k, v in REQUESTS.items() if k not in EVALUATED}),
     }
 
-    resp = client.post("/evaluate", json=json_blob)
-    assert resp.status_code == 422
-    json = resp.json()
-    assert json["detail"][0]["loc"][0] == "body"
-    assert json["detail"][0]["type"] == "value_error"
+
+def _assert_err(resp, loc_idx, loc_val, err_type, code=422, detail_idx=0):
+    detail = resp.json()["detail"][detail_idx]
+    assert (resp.status_code, detail["loc"][loc_idx], detail["type"]) == (code, loc_val, err_type)
+
+
+def test_validate_control_variant(responses):
+    resp = responses["control_variant"]
+    _assert_err(resp, 1, "control_variant", "missing")
+
+
+def test_validate_metric_nominator(responses):
+    resp = responses["metric_nominator"]
+    _assert_err(resp, 3, "nominator", "missing")
+
+
+def test_validate_metric_denominator(responses):
+    resp = responses["metric_denominator"]
+    _assert_err(resp, 3, "denominator", "missing")
+
+
+def test_validate_default_check_type(responses):
+    resp = responses["default_check_type"]
+    assert resp.status_code == 200
+
+
+def test_validate_sum_ratio_nominator(responses):
+    resp = responses["sum_ratio_nominator"]
+    _assert_err(resp, 1, "checks", "value_error")
+
+
+def test_validate_metric_parsing(responses):
+    resp = responses["metric_parsing"]
+    _assert_err(resp, 1, "metrics", "value_error")
+
+
+def test_date_parsing(responses):
+    resp = responses["date_parsing_valid"]
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("detail_idx, loc", [(0, "date_from"), (1, "date_to")])
+def test_date_parsing_invalid(responses, detail_idx, loc):
+    _assert_err(responses["date_parsing_invalid"], 1, loc, "value_error", detail_idx=detail_idx)
+
+
+def test_validate_date_to_ge_from(responses):
+    resp = responses["date_to_ge_from"]
+    _assert_err(resp, 0, "body", "value_error")
+
+
+@pytest.mark.parametrize("name", ["date_for_without_date_to", "date_for_without_date_from"])
+def test_validate_date_for_requires_date_to_and_date_for(responses, name):
+    _assert_err(responses[name], 0, "body", "value_error")
+
+
+@pytest.mark.parametrize("name", ["date_for_after_date_to", "date_for_before_date_from"])
+def test_validate_date_for_between_date_to_and_date_for(responses, name):
+    _assert_err(responses[name], 0, "body", "value_error")
+
+
+def test_filter_scope_trigger_empty_goal(responses):
+    resp = responses["trigger_empty_goal"]
+    _assert_err(resp, 0, "body", "value_error")
+
+
+def test_filter_scope_trigger_empty_dimension(responses):
+    resp = responses["trigger_empty_dimension"]
+    assert resp.status_code == 200
+
+
+def test_filter_scope_exposure_empty_dimension(responses):
+    resp = responses["exposure_empty_dimension"]
+    _assert_err(resp, 0, "body", "value_error")
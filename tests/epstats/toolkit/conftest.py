@@ -0,0 +1,8 @@
+import pytest
+
+from src.epstats.toolkit.testing import TestDao, TestData
+
+
+@pytest.fixture(scope="session")
+def dao():
+    return TestDao(TestData())
@@ -1,26 +1,24 @@
+from functools import partial
+
 import pytest
 
 from src.epstats.toolkit.check import SrmCheck, SumRatioCheck
 from src.epstats.toolkit.experiment import Experiment
-from src.epstats.toolkit.testing import TestDao, TestData, evaluate_experiment_agg
-
-
-@pytest.fixture(scope="module")
-def dao():
-    return TestDao(TestData())
+from src.epstats.toolkit.testing import evaluate_experiment_agg
 
+# shared by all experiments below, `Experiment` needs a list (it concatenates metrics and checks), do not mutate
+_EMPTY_METRICS = []
 
-@pytest.fixture(scope="module")
-def metrics():
-    return []
+# all check tests evaluate experiments with the same control variant, unit type and no metrics
+_experiment = partial(Experiment, control_variant="a", metrics=_EMPTY_METRICS, unit_type="test_unit_type")
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def srm_check():
     return [SrmCheck(1, "SRM", "count(test_unit_type.global.exposure)")]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def sum_ratio_check():
     return [
         SumRatioCheck(
@@ -32,7 +30,7 @@ def sum_ratio_check():
     ]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def checks():
     return [
         SumRatioCheck(
@@ -45,29 +43,27 @@ def checks():
     ]
 
 
-# Testing standard input - no SRM detected
-def test_srm(dao, metrics, srm_check):
-    experiment = Experiment("test-srm", "a", metrics, srm_check, unit_type="test_unit_type")
-    evaluate_experiment_agg(experiment, dao)
-
-
-# Testing standard input - SRM detected
-def test_srm_negative(dao, metrics, srm_check):
-    experiment = Experiment("test-srm-negative", "a", metrics, srm_check, unit_type="test_unit_type")
-    evaluate_experiment_agg(experiment, dao)
-
-
-# Testing one-variant test, e.g. A/A test - NaN output expected
-def test_srm_one_variant(dao, metrics, srm_check):
-    experiment = Experiment("test-srm-one-variant", "a", metrics, srm_check, unit_type="test_unit_type")
+@pytest.mark.parametrize(
+    "experiment_id",
+    [
+        # Testing standard input - no SRM detected
+        "test-srm",
+        # Testing standard input - SRM detected
+        "test-srm-negative",
+        # Testing one-variant test, e.g. A/A test - NaN output expected
+        "test-srm-one-variant",
+    ],
+)
+def test_srm(dao, srm_check, experiment_id):
+    experiment = _experiment(experiment_id, checks=srm_check)
     evaluate_experiment_agg(experiment, dao)
 
 
-def test_sum_ratio(dao, metrics, sum_ratio_check):
-    experiment = Experiment("test-sum-ratio", "a", metrics, sum_ratio_check, unit_type="test_unit_type")
+def test_sum_ratio(dao, sum_ratio_check):
+    experiment = _experiment("test-sum-ratio", checks=sum_ratio_check)
     evaluate_experiment_agg(experiment, dao)
 
 
-def test_multi_check(dao, metrics, checks):
-    experiment = Experiment("test-multi-check", "a", metrics, checks, unit_type="test_unit_type")
+def test_multi_check(dao, checks):
+    experiment = _experiment("test-multi-check", checks=checks)
     evaluate_experiment_agg(experiment, dao)
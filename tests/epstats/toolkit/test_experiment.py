@@ -4,19 +4,12 @@ from src.epstats.toolkit.check import SimpleSrmCheck, SrmCheck
 from src.epstats.toolkit.experiment import Experiment, Filter, FilterScope
 from src.epstats.toolkit.metric import Metric, SimpleMetric
 from src.epstats.toolkit.testing import (
-    TestDao,
-    TestData,
     evaluate_experiment_agg,
     evaluate_experiment_by_unit,
     evaluate_experiment_simple_agg,
 )
 
 
-@pytest.fixture(scope="module")
-def dao():
-    return TestDao(TestData())
-
-
 @pytest.fixture(scope="module")
 def metrics():
     return [
@@ -457,7 +450,6 @@ def test_degrees_of_freedom(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
 def test_missing_default(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-default",
@@ -469,8 +461,6 @@ def test_missing_default(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
-@pytest.mark.filterwarnings("ignore:divide by zero")
 def test_missing_default_exposure(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-default-exposure",
@@ -482,7 +472,6 @@ def test_missing_default_exposure(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
 def test_missing_default_value(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-default-value",
@@ -494,8 +483,6 @@ def test_missing_default_value(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
-@pytest.mark.filterwarnings("ignore:divide by zero")
 def test_missing_exposure(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-exposure",
@@ -518,7 +505,6 @@ def test_missing_value(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
 def test_bad_experiment_unit(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "bad-experiment-unit",
@@ -530,7 +516,6 @@ def test_bad_experiment_unit(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
 def test_missing_all_value(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-all-value",
@@ -542,7 +527,6 @@ def test_missing_all_value(dao, metrics, checks, unit_type):
     evaluate_experiment_agg(experiment, dao)
 
 
-@pytest.mark.filterwarnings("ignore:invalid value")
 def test_missing_all(dao, metrics, checks, unit_type):
     experiment = Experiment(
         "test-missing-all",
@@ -3,7 +3,21 @@ import pytest
 from src.epstats.toolkit.experiment import Experiment
 from src.epstats.toolkit.testing.utils import check_docstring
 
+# docstrings are resolved once at collection, not in every test, members without docstring are not collected
+_DOCSTRINGS = [
+    (m, getattr(Experiment, m).__doc__)
+    for m in dir(Experiment)
+    if not m.startswith("_") and getattr(Experiment, m).__doc__ is not None
+]
 
-@pytest.mark.parametrize("m", [m for m in dir(Experiment) if not m.startswith("_")])
-def test_experiment_docstring(m):
-    check_docstring(getattr(Experiment, m).__doc__, indent=8)
+
+def pytest_generate_tests(metafunc):
+    if "doc" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "doc",
+            [pytest.param(doc, id=m) for m, doc in _DOCSTRINGS],
+        )
+
+
+def test_experiment_docstring(doc):
+    check_docstring(doc)
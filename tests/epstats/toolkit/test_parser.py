@@ -1,40 +1,58 @@
 import numpy as np
 import pandas as pd
 import pytest
-from numpy.testing import assert_almost_equal
+from numpy.testing import assert_allclose
 from pyparsing import ParseException
 
-from src.epstats.toolkit.parser import MultOp, Parser
+from src.epstats.toolkit.parser import MultOp, Parser, _FastParser, _get_grammar, get_parser
 
 
-def test_evaluate_agg():
+@pytest.fixture(scope="session")
+def random_goals():
     variants = ["a", "b", "c", "d"]
     goals = ["click", "exposure", "conversion", "refund"]
     ln = len(variants) * len(goals)
+    rng = np.random.default_rng(0)
 
-    goals = pd.DataFrame(
+    return pd.DataFrame(
         {
             "exp_id": "test",
             "exp_variant_id": np.repeat(variants, len(goals)),
             "unit_type": "test_unit_type",
             "agg_type": "unit",
             "goal": goals * len(variants),
-            "count": 1000 + np.random.randint(-100, 100, ln),
-            "sum_sqr_count": 1000 + np.random.randint(-100, 100, ln),
-            "sum_value": 10 + np.random.normal(0, 3, ln),
-            "sum_sqr_value": 100 + np.random.normal(0, 10, ln),
+            "count": 1000 + rng.integers(-100, 100, ln),
+            "sum_sqr_count": 1000 + rng.integers(-100, 100, ln),
+            "sum_value": 10 + rng.normal(0, 3, ln),
+            "sum_sqr_value": 100 + rng.normal(0, 10, ln),
         }
     )
 
+
+@pytest.fixture(scope="session")
+def random_goal_columns(random_goals):
+    """
+    Expected columns of every goal in `random_goals` as plain arrays, extracted only once.
+    """
+    return {
+        goal: {column: g[column].to_numpy() for column in ["count", "sum_sqr_count", "sum_value", "sum_sqr_value"]}
+        for goal, g in random_goals.groupby("goal", sort=False)
+    }
+
+
+def test_evaluate_agg(random_goals, random_goal_columns):
+    goals = random_goals
+    columns = random_goal_columns
+
     parser = Parser(
         "count(test_unit_type.unit.click)",
         "count(test_unit_type.unit.exposure)",
     )
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals.goal == "exposure"]["count"].values,
-        goals[goals.goal == "click"]["count"].values,
-        goals[goals.goal == "click"]["sum_sqr_count"].values,
+        columns["exposure"]["count"],
+        columns["click"]["count"],
+        columns["click"]["sum_sqr_count"],
     )
 
     parser = Parser(
@@ -42,13 +60,13 @@ def test_evaluate_agg():
         "count(test_unit_type.unit.exposure)",
     )
 
-    conversion_sqr_value = goals[goals.goal == "conversion"]["sum_sqr_value"].to_numpy()
-    refund_sqr_value = goals[goals.goal == "refund"]["sum_sqr_value"].to_numpy()
-    conversion_value = goals[goals.goal == "conversion"]["sum_value"].to_numpy()
-    refund_value = goals[goals.goal == "refund"]["sum_value"].to_numpy()
+    conversion_sqr_value = columns["conversion"]["sum_sqr_value"]
+    refund_sqr_value = columns["refund"]["sum_sqr_value"]
+    conversion_value = columns["conversion"]["sum_value"]
+    refund_value = columns["refund"]["sum_value"]
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals.goal == "exposure"]["count"],
+        columns["exposure"]["count"],
         conversion_value - refund_value,
         conversion_sqr_value - refund_sqr_value,
     )
@@ -59,7 +77,7 @@ def test_evaluate_agg():
     )
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals.goal == "exposure"]["count"],
+        columns["exposure"]["count"],
         conversion_value - refund_value,
         conversion_sqr_value + refund_sqr_value,
     )
@@ -70,7 +88,7 @@ def test_evaluate_agg():
     )
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals.goal == "exposure"]["count"].to_numpy() / 1000,
+        columns["exposure"]["count"] / 1000,
         conversion_value,
         conversion_sqr_value,
     )
@@ -85,13 +103,17 @@ def test_evaluate_agg():
     )
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals.goal == "exposure"]["count"],
+        columns["exposure"]["count"],
         conversion_value - refund_value - refund_value,
         conversion_sqr_value - refund_sqr_value - refund_sqr_value,
     )
 
 
 def test_evaluate_agg_dimensional():
+    rng = np.random.default_rng(0)
+    # one draw per distribution, rows are (count, sum_sqr_count) and (sum_value, sum_sqr_value)
+    counts = 1000 + rng.integers(-100, 100, size=(2, 6))
+    values = rng.normal([[10], [100]], [[3], [10]], size=(2, 6))
     goals = pd.DataFrame(
         {
             "exp_id": "testt",
@@ -99,10 +121,10 @@ def test_evaluate_agg_dimensional():
             "unit_type": "test_unit_type",
             "agg_type": "unit",
             "goal": ["exposure", "click", "click"] * 2,
-            "count": 1000 + np.random.randint(-100, 100, 6),
-            "sum_sqr_count": 1000 + np.random.randint(-100, 100, 6),
-            "sum_value": 10 + np.random.normal(0, 3, 6),
-            "sum_sqr_value": 100 + np.random.normal(0, 10, 6),
+            "count": counts[0],
+            "sum_sqr_count": counts[1],
+            "sum_value": values[0],
+            "sum_sqr_value": values[1],
             "product": ["", "", "p_1"] * 2,
             "country": ["", "", "US"] * 2,
         }
@@ -113,13 +135,16 @@ def test_evaluate_agg_dimensional():
         "count(test_unit_type.unit.exposure)",
     )
 
-    click_mask = (goals["goal"] == "click") & (goals["country"] == "US") & (goals["product"] == "p_1")
+    # split goals by name only once instead of masking the whole frame for every goal
+    by_goal = dict(list(goals.groupby("goal", sort=False)))
+    clicks = by_goal["click"]
+    clicks = clicks[(clicks["country"] == "US") & (clicks["product"] == "p_1")]
 
     assert_count_value(
         parser.evaluate_agg(goals),
-        goals[goals["goal"] == "exposure"]["count"].values,
-        goals[click_mask]["count"].values,
-        goals[click_mask]["sum_sqr_count"].values,
+        by_goal["exposure"]["count"].to_numpy(),
+        clicks["count"].to_numpy(),
+        clicks["sum_sqr_count"].to_numpy(),
     )
 
 
@@ -151,10 +176,10 @@ def test_fail_if_incorrect_syntax():
 
 
 @pytest.mark.parametrize(
-    "parser, expected",
+    "expressions, expected",
     [
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion) - value(test_unit_type.unit.refund)",
                 "count(test_unit_type.global.exposure)",
             ),
@@ -165,7 +190,7 @@ def test_fail_if_incorrect_syntax():
             },
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.global.conversion)",
                 "count(test_unit_type.global.exposure)",
             ),
@@ -175,7 +200,7 @@ def test_fail_if_incorrect_syntax():
             },
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion) ~ value(test_unit_type.unit.refund)",
                 "count(test_unit_type.global.exposure)",
             ),
@@ -186,7 +211,7 @@ def test_fail_if_incorrect_syntax():
             },
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion(a=b, y=x, test=test))",
                 "count(test_unit_type.global.exposure)",
             ),
@@ -196,7 +221,7 @@ def test_fail_if_incorrect_syntax():
             },
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion(a=b))",
                 "count(test_unit_type.global.exposure)",
             ),
@@ -206,21 +231,21 @@ def test_fail_if_incorrect_syntax():
             },
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion(product=p_1))",
                 "value(test_unit_type.unit.conversion(product=p_1))",
             ),
             {"test_unit_type.unit.conversion[product=p_1]"},
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion(product=p_1))",
                 "value(test_unit_type.unit.conversion)",
             ),
             {"test_unit_type.unit.conversion[product=p_1]", "test_unit_type.unit.conversion"},
         ),
         (
-            Parser(
+            (
                 "value(test_unit_type.unit.conversion(product=p_1)) + "
                 "value(test_unit_type.unit.conversion(product=p_1))",
                 "value(test_unit_type.unit.conversion)",
@@ -229,8 +254,8 @@ def test_fail_if_incorrect_syntax():
         ),
     ],
 )
-def test_get_goals(parser, expected):
-    assert parser.get_goals_str() == expected
+def test_get_goals(expressions, expected):
+    assert get_parser(*expressions).get_goals_str() == expected
 
 
 def test_fail_if_duplicate_dimensions():
@@ -242,10 +267,10 @@ def test_fail_if_duplicate_dimensions():
 
 
 @pytest.mark.parametrize(
-    "parser, expected_goals",
+    "expressions, expected_goals",
     [
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(product=p_1)) + count(test_unit_type.global.conversion)",
                 "count(test_unit_type.unit.conversion(product=p_1_2))",
             ),
@@ -256,7 +281,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(x=1, y=2))",
                 "count(test_unit_type.unit.conversion)",
             ),
@@ -266,7 +291,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(x=1, y=2))",
                 "count(test_unit_type.global.conversion(x=1))",
             ),
@@ -276,7 +301,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(x=A/ A, y=A B /C))",
                 "count(test_unit_type.unit.conversion)",
             ),
@@ -286,7 +311,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(x=A/ A|BB, y=X|Y|Z))",
                 "count(test_unit_type.unit.conversion)",
             ),
@@ -296,7 +321,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test_unit_type.global.conversion(x=^test|test, y=^test))",
                 "count(test_unit_type.unit.conversion)",
             ),
@@ -306,7 +331,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test.global.conversion(x=test, y>=123))",
                 "count(test.unit.conversion(a<=4, b>42))",
             ),
@@ -316,7 +341,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test.global.conversion(x=test, y!=123))",
                 "count(test.global.conversion)",
             ),
@@ -326,7 +351,7 @@ def test_fail_if_duplicate_dimensions():
             },
         ),
         (
-            Parser(
+            (
                 "count(test.global.conversion(x_1=test, x_234=234))",
                 "count(test.global.conversion)",
             ),
@@ -337,8 +362,8 @@ def test_fail_if_duplicate_dimensions():
         ),
     ],
 )
-def test_get_goals_dimensional(parser, expected_goals):
-    goals = parser.get_goals()
+def test_get_goals_dimensional(expressions, expected_goals):
+    goals = get_parser(*expressions).get_goals()
 
     for g in goals:
         assert expected_goals[str(g)] == g.dimension_to_value
@@ -376,7 +401,36 @@ def test_numbers(nominator):
     )
 
 
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "-1 * count(test_unit_type.global.conversion)",
+        "value(test_unit_type.unit.conversion) - value(test_unit_type.unit.refund) / 2",
+        "(value(test_unit_type.unit.conversion) + 2) * count(test_unit_type.global.exposure)",
+        "value(test_unit_type.unit.conversion) ~ value(test_unit_type.unit.refund) + 1 - 2",
+        "count(test_unit_type.global.conversion(x=A/ A|BB, y=^test, z>=1,))",
+        "count(test.unit.conversion( a<=4 , b!=42 ))",
+        "count(test.unit.conversion(a=x\ty,\tb=1))\t*\t2",
+    ],
+)
+def test_fast_parser_matches_grammar(expression):
+    expr = _FastParser(expression).parse()
+    grammar_expr = _get_grammar().parseString(expression)[0]
+    assert type(expr) is type(grammar_expr)
+    assert str(expr) == str(grammar_expr)
+    assert [g.dimension_to_value for g in expr.get_goals()] == [g.dimension_to_value for g in grammar_expr.get_goals()]
+
+
+def test_get_parser_copies_goals():
+    expressions = ("value(test.unit.conversion(x=1)) * 2", "count(test.unit.exposure)")
+    for goal in get_parser(*expressions).get_goals():
+        goal.dimension_to_value["y"] = ""
+    assert [g.dimension_to_value for g in get_parser(*expressions)._nominator_expr.get_goals()] == [{"x": "1"}]
+
+
 def assert_count_value(evaluation, count, value, value_sqr, precision=5):
-    assert_almost_equal(evaluation[0], count, precision)
-    assert_almost_equal(evaluation[1], value, precision)
-    assert_almost_equal(evaluation[2], value_sqr, precision)
+    # rows are (count, sum_value, sum_sqr_value) compared in one pass,
+    # same absolute tolerance as `assert_almost_equal` with `decimal=precision`
+    actual = np.stack([np.asarray(x, dtype=float) for x in evaluation[:3]])
+    expected = np.stack([np.asarray(x, dtype=float) for x in (count, value, value_sqr)])
+    assert_allclose(actual, expected, rtol=0, atol=1.5 * 10**-precision)
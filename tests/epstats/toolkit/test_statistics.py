@@ -1,12 +1,57 @@
+import math
+from functools import lru_cache
+
 import numpy as np
 import pytest
 from statsmodels.stats.power import TTestIndPower
 
 from src.epstats.toolkit.statistics import Statistics
 
+# one power solver shared by all reference sample size computations
+_T_TEST_POWER = TTestIndPower()
+
+
+@lru_cache(maxsize=None)
+def _solve_nobs1(effect_size, alpha):
+    """
+    Reference sample size per variant (nobs1) from statsmodels, solved once per `effect_size` and `alpha`.
+    """
+    return _T_TEST_POWER.solve_power(
+        effect_size=effect_size,
+        ratio=1.0,  # N_A / N_B
+        alpha=alpha,
+        power=0.8,
+        nobs1=None,
+    )
+
+
+@lru_cache(maxsize=None)
+def _required_sample_size(n_variants, minimum_effect, mean, std):
+    """
+    Required sample size per variant used as an input of other tests, computed once per parameters.
+    """
+    return Statistics.required_sample_size_per_variant(
+        n_variants=n_variants,
+        minimum_effect=minimum_effect,
+        mean=mean,
+        std=std,
+    )
+
 
-def _assert_sample_sizes_equal(x, y):
-    assert abs(x - y) <= 2
+# expected from https://bookingcom.github.io/powercalculator
+_EQUAL_VARIANCE_CASES = [
+    (2, 0.10, 0.2, 1.2, 56512),
+    (2, 0.10, 0.2, 2.0, 156978),
+    (2, 0.10, 0.3, 1.2, 25117),
+    (2, 0.10, 0.3, 2.0, 69768),
+    (2, 0.05, 0.2, 1.2, 226048),
+    (2, 0.05, 0.2, 2.0, 627911),
+    (2, 0.05, 0.3, 1.2, 100466),
+    (2, 0.05, 0.3, 2.0, 279072),
+    (3, 0.05, 0.3, 2.0, 336878),
+    (3, 0.10, 0.2, 1.2, 68218),
+    (4, 0.10, 0.2, 2.0, 208576),
+]
 
 
 def _assert_sample_sizes_equal_within_tolerance(x, y, n_variants):
@@ -18,7 +63,7 @@ def _assert_sample_sizes_equal_within_tolerance(x, y, n_variants):
         rel_tol = 0.005
         assert abs((x - y) / x) <= rel_tol
     else:
-        _assert_sample_sizes_equal(x, y)
+        assert x == pytest.approx(y, rel=0, abs=2)
 
 
 @pytest.mark.parametrize(
@@ -40,22 +85,15 @@ def test_obf_alpha_spending_function(test_length, actual_day, expected):
     assert alpha == expected
 
 
+def test_obf_alpha_spending_function_arrays():
+    alpha = Statistics.obf_alpha_spending_function(0.95, np.array([14, 14, 28]), np.array([1, 7, 8]))
+    np.testing.assert_array_equal(alpha, [1.00, 0.9944, 0.9998])
+    assert Statistics.obf_alpha_spending_function(np.array(0.95), 14, 7) == 0.9944
+
+
 @pytest.mark.parametrize(
-    # expected from https://bookingcom.github.io/powercalculator
     "n_variants, minimum_effect, mean, std, expected",
-    [
-        (2, 0.10, 0.2, 1.2, 56512),
-        (2, 0.10, 0.2, 2.0, 156978),
-        (2, 0.10, 0.3, 1.2, 25117),
-        (2, 0.10, 0.3, 2.0, 69768),
-        (2, 0.05, 0.2, 1.2, 226048),
-        (2, 0.05, 0.2, 2.0, 627911),
-        (2, 0.05, 0.3, 1.2, 100466),
-        (2, 0.05, 0.3, 2.0, 279072),
-        (3, 0.05, 0.3, 2.0, 336878),
-        (3, 0.10, 0.2, 1.2, 68218),
-        (4, 0.10, 0.2, 2.0, 208576),
-    ],
+    _EQUAL_VARIANCE_CASES,
 )
 def test_required_sample_size_per_variant_equal_variance(n_variants, minimum_effect, mean, std, expected):
     sample_size_per_variant = Statistics.required_sample_size_per_variant(
@@ -64,21 +102,67 @@ def test_required_sample_size_per_variant_equal_variance(n_variants, minimum_eff
         mean=mean,
         std=std,
     )
-    effect_size = (mean * (1 + minimum_effect) - mean) / std
+    mean_2 = mean * (1 + minimum_effect)
+    effect_size = (mean_2 - mean) / std
 
-    # nobs1
-    expected_from_statsmodels = TTestIndPower().solve_power(
-        effect_size=effect_size,
-        ratio=1.0,  # N_A / N_B
-        alpha=0.05 / (n_variants - 1),
-        power=0.8,
-        nobs1=None,
-    )
+    expected_from_statsmodels = _solve_nobs1(effect_size, 0.05 / (n_variants - 1))
 
-    _assert_sample_sizes_equal(sample_size_per_variant, round(expected_from_statsmodels))
+    assert sample_size_per_variant == pytest.approx(round(expected_from_statsmodels), rel=0, abs=2)
     _assert_sample_sizes_equal_within_tolerance(sample_size_per_variant, expected, n_variants)
 
 
+@pytest.mark.parametrize("n_variants", [2, 3, 4])
+def test_required_sample_size_per_variant_batch(n_variants):
+    _, minimum_effect, mean, std, _ = np.array(_EQUAL_VARIANCE_CASES).T
+    std_2 = 1.1 * std
+
+    for args in [{}, {"std_2": std_2}]:
+        sample_sizes = Statistics.required_sample_size_per_variant_batch(
+            n_variants=n_variants,
+            minimum_effect=minimum_effect,
+            mean=mean,
+            std=std,
+            **args,
+        )
+        expected = [
+            Statistics.required_sample_size_per_variant(
+                n_variants=n_variants,
+                minimum_effect=minimum_effect[i],
+                mean=mean[i],
+                std=std[i],
+                **{k: v[i] for k, v in args.items()},
+            )
+            for i in range(len(minimum_effect))
+        ]
+        np.testing.assert_array_equal(sample_sizes, expected)
+
+
+def test_required_sample_size_per_variant_array_confidence_level():
+    sample_sizes = Statistics.required_sample_size_per_variant(
+        n_variants=2,
+        minimum_effect=0.1,
+        mean=0.2,
+        std=1.2,
+        confidence_level=np.array([0.95, 0.9]),
+    )
+    np.testing.assert_array_equal(sample_sizes, [56512, 44514])
+
+    power = Statistics.power_from_required_sample_size_per_variant(
+        n_variants=2,
+        sample_size_per_variant=56512,
+        required_sample_size_per_variant=56512,
+        required_power=np.array([0.8, 0.9]),
+    )
+    np.testing.assert_allclose(power, [0.8, 0.9])
+
+
+def test_required_sample_size_per_variant_batch_raises_exception():
+    with pytest.raises(ValueError):
+        Statistics.required_sample_size_per_variant_batch(
+            n_variants=2, minimum_effect=np.array([0.1, -0.1]), mean=np.array([0.2, 0.2]), std=np.array([1.2, 1.2])
+        )
+
+
 @pytest.mark.parametrize(
     "minimum_effect, mean, std, std_2",
     [
@@ -97,32 +181,25 @@ def test_required_sample_size_per_variant_unequal_variance(minimum_effect, mean,
 
     mean_2 = mean * (1 + minimum_effect)
     var_ = (std**2 + std_2**2) / 2
-    std_ = np.sqrt(var_)
+    std_ = math.sqrt(var_)
     effect_size = (mean_2 - mean) / std_
 
-    # nobs1
-    expected_from_statsmodels = TTestIndPower().solve_power(
-        effect_size=effect_size,
-        ratio=1.0,  # N_A / N_B
-        alpha=0.05,
-        power=0.8,
-        nobs1=None,
-    )
+    expected_from_statsmodels = _solve_nobs1(effect_size, 0.05)
 
-    _assert_sample_sizes_equal(sample_size_per_variant, round(expected_from_statsmodels))
+    assert sample_size_per_variant == pytest.approx(round(expected_from_statsmodels), rel=0, abs=2)
 
 
 @pytest.mark.parametrize(
     # expected from https://bookingcom.github.io/powercalculator
-    "n_variants, minimum_effect, mean, std, expected",
+    "n_variants, minimum_effect, mean, expected",
     [
-        (2, 0.05, 0.4, None, 9490),
-        (2, 0.10, 0.1, None, 14749),
-        (3, 0.05, 0.4, None, 11455),
-        (4, 0.10, 0.1, None, 19596),
+        (2, 0.05, 0.4, 9490),
+        (2, 0.10, 0.1, 14749),
+        (3, 0.05, 0.4, 11455),
+        (4, 0.10, 0.1, 19596),
     ],
 )
-def test_required_sample_size_per_variant_bernoulli(n_variants, minimum_effect, mean, std, expected):
+def test_required_sample_size_per_variant_bernoulli(n_variants, minimum_effect, mean, expected):
     sample_size_per_variant = Statistics.required_sample_size_per_variant_bernoulli(
         n_variants=n_variants,
         minimum_effect=minimum_effect,
@@ -130,22 +207,13 @@ def test_required_sample_size_per_variant_bernoulli(n_variants, minimum_effect,
     )
 
     mean_2 = mean * (1 + minimum_effect)
-    var = mean * (1 - mean)
-    var_2 = mean_2 * (1 - mean_2)
-    std = np.sqrt((var + var_2) / 2)
-
+    # pooled standard deviation of both Bernoulli variants
+    std = math.sqrt((mean * (1 - mean) + mean_2 * (1 - mean_2)) / 2)
     effect_size = (mean_2 - mean) / std
 
-    # nobs1
-    expected_from_statsmodels = TTestIndPower().solve_power(
-        effect_size=effect_size,
-        ratio=1.0,
-        alpha=0.05 / (n_variants - 1),
-        power=0.8,
-        nobs1=None,
-    )
+    expected_from_statsmodels = _solve_nobs1(effect_size, 0.05 / (n_variants - 1))
 
-    _assert_sample_sizes_equal(sample_size_per_variant, round(expected_from_statsmodels))
+    assert sample_size_per_variant == pytest.approx(round(expected_from_statsmodels), rel=0, abs=2)
     _assert_sample_sizes_equal_within_tolerance(sample_size_per_variant, expected, n_variants)
 
 
@@ -202,14 +270,9 @@ def test_power_from_required_sample_size_per_variant(n_variants, sample_size_per
     mean = 0.2
     std = 2.0
     minimum_effect = 0.05
-    required_sample_size_per_variant = Statistics.required_sample_size_per_variant(
-        n_variants=n_variants,
-        std=std,
-        mean=mean,
-        minimum_effect=minimum_effect,
-    )
+    required_sample_size_per_variant = _required_sample_size(n_variants, minimum_effect, mean, std)
 
-    expected = TTestIndPower().solve_power(
+    expected = _T_TEST_POWER.solve_power(
         effect_size=(mean * (1 + minimum_effect) - mean) / std,
         ratio=1.0,
         alpha=0.05 / (n_variants - 1),